@@ -2,16 +2,34 @@
 # Minimal sequence ONLY: RESET → BOOSTER_SOFT_START → POWER_ON → (write) → REFRESH → SLEEP
 # No PANEL_SETTING/PLL/RES/VCOM (those broke visuals on your glass).
 
-import time, spidev, board, digitalio
+import os, time, spidev, board, digitalio
+from datetime import timedelta
 from PIL import Image
 
+# libgpiod (v2 bindings) lets _wait block on a BUSY edge instead of polling;
+# without it we fall back to the digitalio 20 ms poll loop.
+try:
+    import gpiod
+    from gpiod.line import Direction as GpiodDirection, Edge as GpiodEdge, Value as GpiodValue
+except ImportError:
+    gpiod = None
+
 # Pins (bonnet defaults)
 PIN_DC, PIN_RST, PIN_BUSY = board.D22, board.D27, board.D17
+# header GPIOs live on gpiochip0 on most Pis; a Pi 5 on an older kernel
+# exposes them elsewhere (e.g. EPD_GPIO_CHIP=/dev/gpiochip4)
+BUSY_GPIO_CHIP = os.environ.get("EPD_GPIO_CHIP", "/dev/gpiochip0")
+BUSY_GPIO_LINE = PIN_BUSY.id   # BCM offset, taken from the pin itself
 
 # Geometry
 W, H = 648, 480
 BUF_BYTES = (W * H) // 8
-SPI_MAX_CHUNK = 4096
+SPI_MAX_CHUNK = 32768
+# UC8179 is rated well past this; drop back to 4_000_000 if long jumper
+# wires start corrupting frames
+SPI_SPEED_HZ = 10_000_000
+SPI_FALLBACK_HZ = 4_000_000   # init() retries at this if POWER_ON never clears
+WHITE_FRAME = bytes([0xFF]) * BUF_BYTES
 
 # Minimal command set
 POWER_ON                  = 0x04
@@ -25,34 +43,27 @@ DEEP_SLEEP                = 0x07
 BUSY_HIGH_IS_BUSY = False
 
 def pil_to_panel(img: Image.Image) -> bytes:
-    """Convert PIL image to 1bpp packed buffer; panel expects 1=white, 0=black (so we invert)."""
-    img = img.convert("1").resize((W, H))
+    """Convert PIL image to 1bpp packed buffer; panel expects 1=white, 0=black."""
+    if img.mode != "1":
+        img = img.convert("1")
+    if img.size != (W, H):
+        img = img.resize((W, H))
     # If the image appears upside-down on your panel, uncomment this:
     # img = img.transpose(Image.FLIP_TOP_BOTTOM)
-    pix = img.load()
-    out = bytearray(BUF_BYTES); i = 0
-    for y in range(H):
-        b = 0
-        for x in range(W):
-            bit = 7 - (x & 7)
-            if pix[x, y] == 0:           # black pixel
-                b |= (1 << bit)
-            if (x & 7) == 7:
-                out[i] = (~b) & 0xFF     # invert: 1=white, 0=black
-                i += 1
-                b = 0
-        if (W & 7) != 0:
-            out[i] = (~b) & 0xFF; i += 1
-    return bytes(out)
+    # PIL's "1" raw layout is already MSB-first, 1=white, rows padded to a byte
+    # boundary, which is exactly what the panel wants — no per-pixel loop needed.
+    return img.tobytes()
 
 class EPD583:
     def __init__(self):
         # GPIO
         self.dc   = digitalio.DigitalInOut(PIN_DC);   self.dc.direction   = digitalio.Direction.OUTPUT; self.dc.value = 1
         self.rst  = digitalio.DigitalInOut(PIN_RST);  self.rst.direction  = digitalio.Direction.OUTPUT; self.rst.value = 1
-        self.busy = digitalio.DigitalInOut(PIN_BUSY); self.busy.direction = digitalio.Direction.INPUT
+        self.busy = None; self.busy_req = self._request_busy_edges()
+        if self.busy_req is None:
+            self.busy = digitalio.DigitalInOut(PIN_BUSY); self.busy.direction = digitalio.Direction.INPUT
         # SPI
-        self.spi = spidev.SpiDev(); self.spi.open(0, 0); self.spi.max_speed_hz = 4000000; self.spi.mode = 0
+        self.spi = spidev.SpiDev(); self.spi.open(0, 0); self.spi.max_speed_hz = SPI_SPEED_HZ; self.spi.mode = 0
 
     def _cmd(self, c: int):
         self.dc.value = 0
@@ -62,20 +73,47 @@ class EPD583:
     def _data(self, b):
         self.dc.value = 1
         if isinstance(b, int):
-            b = [b]
-        for i in range(0, len(b), SPI_MAX_CHUNK):
-            self.spi.xfer2(list(b[i:i+SPI_MAX_CHUNK]))
+            b = bytes([b])
+        elif not isinstance(b, (bytes, bytearray, memoryview)):
+            b = bytes(b)   # small command payloads given as lists
+        # writebytes2 takes any buffer directly (no per-byte int list, and
+        # frame buffers are sliced in place rather than copied)
+        mv = memoryview(b)
+        for i in range(0, len(mv), SPI_MAX_CHUNK):
+            self.spi.writebytes2(mv[i:i+SPI_MAX_CHUNK])
+
+    def _request_busy_edges(self):
+        if gpiod is None:
+            return None
+        try:
+            return gpiod.request_lines(
+                BUSY_GPIO_CHIP, consumer="epd583-busy",
+                config={BUSY_GPIO_LINE: gpiod.LineSettings(direction=GpiodDirection.INPUT,
+                                                           edge_detection=GpiodEdge.BOTH)})
+        except (OSError, ValueError):
+            return None
+
+    def _busy_raw(self) -> bool:
+        if self.busy_req is not None:
+            return self.busy_req.get_value(BUSY_GPIO_LINE) == GpiodValue.ACTIVE
+        return self.busy.value
 
     def _wait(self, tag: str, timeout=45.0):
         t0 = time.time()
         while True:
-            raw = self.busy.value
+            raw = self._busy_raw()
             busy = (raw if BUSY_HIGH_IS_BUSY else (not raw))
             if not busy: return True
-            if time.time() - t0 > timeout:
+            left = timeout - (time.time() - t0)
+            if left <= 0:
                 print(f"[warn] timeout {tag}")
                 return False
-            time.sleep(0.02)
+            if self.busy_req is not None:
+                # sleep in the kernel until BUSY toggles (or we time out)
+                if self.busy_req.wait_edge_events(timedelta(seconds=left)):
+                    self.busy_req.read_edge_events()
+            else:
+                time.sleep(0.02)
 
     def _reset(self):
         self.rst.value = 1; time.sleep(0.02)
@@ -86,13 +124,16 @@ class EPD583:
         # EXACT sequence that worked on your panel
         self._reset()
         self._cmd(BOOSTER_SOFT_START); self._data([0xCF, 0xCE, 0x8D])
-        self._cmd(POWER_ON);           self._wait("POWER_ON", 15.0)
+        self._cmd(POWER_ON)
+        if not self._wait("POWER_ON", 15.0) and self.spi.max_speed_hz > SPI_FALLBACK_HZ:
+            print(f"[warn] retrying init at {SPI_FALLBACK_HZ} Hz SPI")
+            self.spi.max_speed_hz = SPI_FALLBACK_HZ
+            self.init()
 
     def show(self, img: Image.Image):
-        buf   = pil_to_panel(img)
-        white = bytes([0xFF]) * BUF_BYTES
+        buf = pil_to_panel(img)
         # old = white, new = image (this ordering matches your working tests)
-        self._cmd(DATA_START_TRANSMISSION_1); self._data(white)
+        self._cmd(DATA_START_TRANSMISSION_1); self._data(WHITE_FRAME)
         self._cmd(DATA_START_TRANSMISSION_2); self._data(buf)
         self._cmd(DISPLAY_REFRESH);           self._wait("REFRESH", 45.0)
 
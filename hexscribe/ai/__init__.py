@@ -1,9 +1,13 @@
 # Makes hexscribe.ai a package and exposes the public API.
 
-from .feature_description_ai import generate_feature_description
+from .feature_description_ai import (
+    generate_feature_description,
+    generate_many,
+)
 from .feature_text_pipeline import save_feature_text_with_ai
 
 __all__ = [
     "generate_feature_description",
+    "generate_many",
     "save_feature_text_with_ai",
 ]
@@ -3,15 +3,58 @@ from __future__ import annotations
 
 import os
 import json
+import atexit
+import hashlib
+import itertools
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Optional
-import requests
+import urllib3
+from urllib3.exceptions import ConnectTimeoutError, HTTPError, MaxRetryError, NewConnectionError
+from urllib3.util.retry import Retry
+
+# orjson parses stream lines noticeably faster; stdlib json also takes bytes
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
 
 # ------------------------------------------------------------------------------
 # Ollama connection
 # ------------------------------------------------------------------------------
 OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
-GENERATE_URL = f"{OLLAMA_HOST}/api/generate"
+# Comma-separated replicas for batch work, picked round-robin per request, e.g.
+#   docker run -d --gpus device=0 -p 11434:11434 ollama/ollama
+#   docker run -d --gpus device=1 -p 11435:11434 ollama/ollama
+#   OLLAMA_HOSTS=http://localhost:11434,http://localhost:11435
+OLLAMA_HOSTS = [h.strip().rstrip("/")
+                for h in os.environ.get("OLLAMA_HOSTS", OLLAMA_HOST).split(",") if h.strip()]
+HOST_RETRY_AFTER = 30.0  # seconds an unreachable host is skipped
 DEFAULT_MODEL = os.environ.get("HEXSCRIBE_MODEL", "llama3.2:3b")
+# keep the model (and its cached system-prompt prefix) resident between calls
+KEEP_ALIVE = os.environ.get("HEXSCRIBE_KEEP_ALIVE", "30m")
+
+# one urllib3 pool manager for every call so repeat rewrites reuse a warm
+# socket; talked to directly, without a requests.Session layered on top
+_POOL = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=16,
+    retries=Retry(total=2, backoff_factor=0.2,
+                  status_forcelist=(502, 503, 504),
+                  allowed_methods=frozenset({"POST"})),
+    headers={"Content-Type": "application/json"},
+)
+atexit.register(_POOL.clear)
+
+_host_cycle = itertools.cycle(OLLAMA_HOSTS)
+_host_down: dict[str, float] = {}   # host -> monotonic time it failed to connect
+_host_lock = threading.Lock()
 
 # ------------------------------------------------------------------------------
 # Prompting and length control
@@ -21,12 +64,22 @@ SYSTEM_INSTRUCTION = (
     "into one evocative, game-usable paragraph. Keep all stated facts; do not invent new lore. "
     "Use present tense, avoid second person and purple prose, and keep it concise."
 )
+# always sent first and byte-identical, so Ollama can reuse the prefilled prefix
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_INSTRUCTION}
 
 # soft target, reinforced in prompt; we also hard-trim after generation
 TARGET_WORDS_MIN = 70
 TARGET_WORDS_MAX = 110
 DEFAULT_MAX_WORDS = 220  # relaxed because we'll scroll visually
 
+# ------------------------------------------------------------------------------
+# Response cache (exact match on every prompt input, temperature included):
+# resubmitting the same notes reuses the earlier rewrite instead of a new draw
+# ------------------------------------------------------------------------------
+CACHE_DIR = Path(os.environ.get("HEXSCRIBE_CACHE_DIR", Path.home() / ".cache" / "hexscribe"))
+_cache_db: Optional[sqlite3.Connection] = None
+_cache_lock = threading.Lock()   # generate_many may hit the cache from workers
+
 
 def generate_feature_description(
     notes: str,
@@ -41,29 +94,86 @@ def generate_feature_description(
     """
     Transform raw notes into a single polished fantasy paragraph.
     Returns text trimmed to max_words (word boundary; adds ellipsis if needed).
+    Results are cached on disk under HEXSCRIBE_CACHE_DIR (default
+    ~/.cache/hexscribe) keyed on the prompt inputs and temperature.
     """
-    prompt = _build_prompt(notes, tone=tone)
+    key = _cache_key(notes, model=model, temperature=temperature, tone=tone, max_words=max_words)
+    hit = _cache_get(key)
+    if hit is not None:
+        return hit
+
+    messages = _build_messages(notes, tone=tone)
+    host = _pick_host()
     try:
         if stream:
-            out = _generate_stream(model, prompt, temperature, timeout)
+            out = _generate_stream(host, model, messages, temperature, timeout)
         else:
-            out = _generate_blocking(model, prompt, temperature, timeout)
-    except requests.RequestException as e:
+            out = _generate_blocking(host, model, messages, temperature, timeout)
+    except (HTTPError, ValueError) as e:
+        # ValueError: a body or stream line that isn't valid JSON (both
+        # json's and orjson's decode errors subclass it)
+        if isinstance(e, HTTPError) and _is_connect_error(e):
+            _mark_down(host)
+            host = _pick_host()
         try:
-            out = _generate_blocking(model, prompt, temperature, timeout)
-        except Exception:
-            raise RuntimeError(f"Ollama request failed: {e}") from e
+            out = _generate_blocking(host, model, messages, temperature, timeout)
+        except Exception as retry_err:
+            raise RuntimeError(f"Ollama request failed: {retry_err}") from retry_err
 
-    return _trim_to_words(out, max_words).strip()
+    text = _trim_to_words(out, max_words).strip()
+    if text:
+        _cache_put(key, text)
+    return text
+
+
+def generate_many(
+    notes_list: list[str],
+    *,
+    concurrency: int = 4,
+    **kwargs,
+) -> list[str]:
+    """
+    Run generate_feature_description over several notes at once.
+    Requests overlap on the shared urllib3 pool (up to `concurrency` in flight);
+    results come back in input order. Any failure is raised, as for one call.
+    """
+    if not notes_list:
+        return []
+    workers = max(1, min(concurrency, len(notes_list)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda n: generate_feature_description(n, **kwargs), notes_list))
 
 
 # ------------------------------------------------------------------------------
 # Internals
 # ------------------------------------------------------------------------------
-def _build_prompt(notes: str, *, tone: Optional[str]) -> str:
+def _pick_host() -> str:
+    """Next host in rotation, skipping ones that recently refused a connection."""
+    now = time.monotonic()
+    with _host_lock:
+        for _ in range(len(OLLAMA_HOSTS)):
+            host = next(_host_cycle)
+            if now - _host_down.get(host, float("-inf")) >= HOST_RETRY_AFTER:
+                return host
+        # everything looks down; try anyway rather than fail without a request
+        return next(_host_cycle)
+
+
+def _is_connect_error(e: HTTPError) -> bool:
+    """True when the host could not be reached at all (as opposed to an HTTP error reply)."""
+    reason = e.reason if isinstance(e, MaxRetryError) else e
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+def _mark_down(host: str) -> None:
+    if len(OLLAMA_HOSTS) > 1:
+        with _host_lock:
+            _host_down[host] = time.monotonic()
+
+
+def _user_prompt(notes: str, *, tone: Optional[str]) -> str:
     tone_line = f"Preferred tone: {tone}.\n" if tone else ""
     return (
-        f"{SYSTEM_INSTRUCTION}\n\n"
         f"{tone_line}"
         f"Notes:\n{notes.strip()}\n\n"
         f"Output:\nA single paragraph of {TARGET_WORDS_MIN}-{TARGET_WORDS_MAX} words, "
@@ -71,34 +181,115 @@ def _build_prompt(notes: str, *, tone: Optional[str]) -> str:
     )
 
 
-def _generate_stream(model: str, prompt: str, temperature: float, timeout: int) -> str:
+def _build_messages(notes: str, *, tone: Optional[str]) -> list[dict]:
+    return [SYSTEM_MESSAGE, {"role": "user", "content": _user_prompt(notes, tone=tone)}]
+
+
+def _payload(model: str, messages: list[dict], temperature: float, stream: bool) -> dict:
+    return {
+        "model": model,
+        "messages": messages,
+        "stream": stream,
+        "keep_alive": KEEP_ALIVE,
+        "options": {"temperature": temperature},
+    }
+
+
+def _post(host: str, path: str, payload: dict, timeout: int, stream: bool):
+    r = _POOL.request("POST", f"{host}{path}", body=_json_dumps(payload),
+                      timeout=timeout, preload_content=not stream)
+    if r.status >= 400:
+        if stream:
+            r.drain_conn()
+            r.release_conn()
+        raise HTTPError(f"Ollama returned HTTP {r.status}")
+    return r
+
+
+def _generate_stream(host: str, model: str, messages: list[dict], temperature: float, timeout: int) -> str:
     out_parts: list[str] = []
-    with requests.post(
-        GENERATE_URL,
-        json={"model": model, "prompt": prompt, "stream": True, "options": {"temperature": temperature}},
-        stream=True,
-        timeout=timeout,
-    ) as r:
-        r.raise_for_status()
-        for line in r.iter_lines():
-            if not line:
-                continue
-            j = json.loads(line.decode("utf-8"))
-            out_parts.append(j.get("response", ""))
-            if j.get("done"):
-                break
+
+    def feed(line: bytes) -> None:
+        # each line is {"model":..,"message":{"role":"assistant","content":".."},..}
+        # or, if generation fails mid-stream, {"error": ".."}
+        if not line.strip():
+            return
+        j = _json_loads(line)
+        if "error" in j:
+            raise HTTPError(f"Ollama stream error: {j['error']}")
+        out_parts.append(j.get("message", {}).get("content", ""))
+
+    r = _post(host, "/api/chat", _payload(model, messages, temperature, True), timeout, True)
+    try:
+        tail = b""
+        for chunk in r.stream(8192):
+            *lines, tail = (tail + chunk).split(b"\n")
+            for line in lines:
+                feed(line)
+        feed(tail)
+        # no break on "done": it is the final line, and reading through to
+        # end-of-stream lets the connection go back to the pool
+    finally:
+        r.release_conn()
     return "".join(out_parts)
 
 
-def _generate_blocking(model: str, prompt: str, temperature: float, timeout: int) -> str:
-    resp = requests.post(
-        GENERATE_URL,
-        json={"model": model, "prompt": prompt, "stream": False, "options": {"temperature": temperature}},
-        timeout=timeout,
-    )
-    resp.raise_for_status()
-    j = resp.json()
-    return j.get("response", "")
+def _generate_blocking(host: str, model: str, messages: list[dict], temperature: float, timeout: int) -> str:
+    r = _post(host, "/api/chat", _payload(model, messages, temperature, False), timeout, False)
+    j = _json_loads(r.data)
+    if "error" in j:
+        raise HTTPError(f"Ollama error: {j['error']}")
+    return j.get("message", {}).get("content", "")
+
+
+def _cache_key(notes: str, *, model: str, temperature: float, tone: Optional[str], max_words: int) -> str:
+    blob = json.dumps({
+        "model": model,
+        "temperature": temperature,
+        "tone": tone or "",
+        "notes": " ".join(notes.split()),
+        "system": SYSTEM_INSTRUCTION,
+        "target": [TARGET_WORDS_MIN, TARGET_WORDS_MAX],
+        "max_words": max_words,
+    }, sort_keys=True)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _cache_conn() -> Optional[sqlite3.Connection]:
+    global _cache_db
+    with _cache_lock:
+        if _cache_db is None:
+            try:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                _cache_db = sqlite3.connect(str(CACHE_DIR / "descriptions.sqlite3"),
+                                            check_same_thread=False)
+                _cache_db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, text TEXT NOT NULL)")
+            except (OSError, sqlite3.Error):
+                _cache_db = None
+    return _cache_db
+
+
+def _cache_get(key: str) -> Optional[str]:
+    db = _cache_conn()
+    if db is None:
+        return None
+    try:
+        with _cache_lock:
+            row = db.execute("SELECT text FROM responses WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def _cache_put(key: str, text: str) -> None:
+    db = _cache_conn()
+    if db is None:
+        return
+    try:
+        with _cache_lock, db:
+            db.execute("INSERT OR REPLACE INTO responses (key, text) VALUES (?, ?)", (key, text))
+    except sqlite3.Error:
+        pass  # cache is best-effort; never fail a rewrite over it
 
 
 def _trim_to_words(text: str, max_words: int) -> str:
@@ -1,11 +1,24 @@
 # hexscribe/ai/feature_text_pipeline.py
 from __future__ import annotations
+import hashlib
 import json
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
 from .feature_description_ai import generate_feature_description
 
+# optional fast path for campaign files with many diamonds
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# (file, diamond uid) -> (digest of the notes we rewrote, text we saved), so
+# resubmitting unchanged notes skips the LLM round-trip. In-memory on purpose:
+# the hex JSON schema stays free of bookkeeping fields.
+_last_rewrite: dict[tuple[str, str], tuple[str, str]] = {}
+
 
 def save_feature_text_with_ai(
     json_path: str | Path,
@@ -20,9 +33,12 @@ def save_feature_text_with_ai(
     Rewrites submitted feature text (for one diamond) via AI and saves the prose
     back into that diamond's 'text' field in the same JSON file.
 
-    - No batch processing.
+    - One diamond per call; generate_many rewrites several notes concurrently.
     - No extra fields.
     - If AI is disabled or errors, user text is saved as-is.
+    - Resubmitting the notes last rewritten for this diamond (same model and
+      tone, text untouched since) returns it without calling the model or
+      writing the file.
 
     Returns the updated diamond dict.
     """
@@ -34,8 +50,12 @@ def save_feature_text_with_ai(
         raise ValueError(f"diamond uid not found: {diamond_uid}")
 
     submitted = (raw_text or "").strip()
+    memo_key = (str(p.resolve()), diamond_uid)
+    digest = _notes_digest(submitted, model, tone)
 
     if use_ai and submitted:
+        if _last_rewrite.get(memo_key) == (digest, target.get("text")):
+            return target
         try:
             rewritten = generate_feature_description(
                 submitted,
@@ -46,9 +66,12 @@ def save_feature_text_with_ai(
             target["text"] = rewritten if rewritten else submitted
         except Exception:
             # fail safe: never block save
+            rewritten = ""
             target["text"] = submitted
+        _remember(memo_key, digest, rewritten)
     else:
         target["text"] = submitted
+        _last_rewrite.pop(memo_key, None)
 
     data["updated_at"] = _iso_now()
     _write_json(p, data)
@@ -68,14 +91,31 @@ def _find_diamond(data: dict, uid: str) -> Optional[dict]:
     return None
 
 
+def _notes_digest(submitted: str, model: str, tone: Optional[str]) -> str:
+    blob = f"{model}\0{tone or ''}\0{submitted}".encode("utf-8")
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+
+def _remember(memo_key: tuple[str, str], digest: str, rewritten: str) -> None:
+    # only a real rewrite is worth skipping next time; a fallback save retries
+    if rewritten:
+        _last_rewrite[memo_key] = (digest, rewritten)
+    else:
+        _last_rewrite.pop(memo_key, None)
+
+
 def _read_json(p: Path) -> dict:
-    return json.loads(p.read_text(encoding="utf-8"))
+    # both parsers take bytes directly; skips a separate decode copy
+    raw = p.read_bytes()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
 
 def _write_json(p: Path, data: dict) -> None:
-    p.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    if orjson is not None:
+        p.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        p.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
 
 
 def _iso_now() -> str:
-    from datetime import datetime, timezone
     return datetime.now(timezone.utc).isoformat()
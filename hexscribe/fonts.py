@@ -1,4 +1,5 @@
-from PIL import ImageFont
+from PIL import Image, ImageDraw, ImageFont
+from functools import lru_cache
 import os
 
 # fallback list from your previous runs
@@ -17,16 +18,48 @@ BLACKLETTER_CANDIDATES = [
     "/usr/local/share/fonts/Berkahi Blackletter.ttf",
 ]
 
+@lru_cache(maxsize=None)
+def _existing(candidates: tuple):
+    """Candidate paths that exist on disk; probed once, not per size."""
+    return tuple(p for p in candidates if os.path.exists(p))
+
+@lru_cache(maxsize=None)
 def load_font(size: int):
-    for p in FONT_CANDIDATES:
-        if os.path.exists(p):
-            try: return ImageFont.truetype(p, size)
-            except Exception: pass
+    for p in _existing(tuple(FONT_CANDIDATES)):
+        try: return ImageFont.truetype(p, size)
+        except Exception: pass
     return ImageFont.load_default()
 
+@lru_cache(maxsize=None)
 def load_blackletter(size: int):
-    for p in BLACKLETTER_CANDIDATES:
-        if os.path.exists(p):
-            try: return ImageFont.truetype(p, size)
-            except Exception: pass
+    for p in _existing(tuple(BLACKLETTER_CANDIDATES)):
+        try: return ImageFont.truetype(p, size)
+        except Exception: pass
     return load_font(size)
+
+@lru_cache(maxsize=None)
+def default_font():
+    """Same font ImageDraw falls back to when text() is called without one."""
+    return ImageFont.load_default()
+
+# ----- text metrics -----
+_PROBE = ImageDraw.Draw(Image.new("1", (1, 1)))
+
+@lru_cache(maxsize=1024)
+def text_bbox(text: str, font):
+    """draw.textbbox((0, 0), text, font=font), measured once per (text, font)."""
+    return _PROBE.textbbox((0, 0), text, font=font)
+
+# ----- pre-rasterized static labels (compass letters, legend rows, ...) -----
+@lru_cache(maxsize=256)
+def text_mask(text: str, font):
+    """1-bit glyph mask for `text` plus the (dx, dy) offset of its ink box."""
+    l, t, r, b = font.getbbox(text, mode="1")
+    m = Image.new("1", (max(1, r - l), max(1, b - t)), 0)
+    ImageDraw.Draw(m).text((-l, -t), text, font=font, fill=1)
+    return m, (l, t)
+
+def draw_text_cached(d: ImageDraw.ImageDraw, xy, text: str, font, fill=0):
+    """Drop-in for d.text(xy, text, font=font, fill=fill) on "1" images."""
+    m, (dx, dy) = text_mask(text, font)
+    d.bitmap((int(xy[0]) + dx, int(xy[1]) + dy), m, fill=fill)
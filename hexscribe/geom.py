@@ -1,22 +1,60 @@
 import math
-from typing import Tuple
 
-def lerp(a, b, t): return (a[0]+(b[0]-a[0])*t, a[1]+(b[1]-a[1])*t)
+_Vec = tuple[float, float]
+_hypot = math.hypot
 
-def perp_unit(a: Tuple[float,float], b: Tuple[float,float]):
-    dx, dy = b[0]-a[0], b[1]-a[1]
-    L = math.hypot(dx, dy) or 1.0
+# hot-path helpers: unpack once into locals instead of repeated indexing
+def lerp(a: _Vec, b: _Vec, t: float) -> _Vec:
+    ax, ay = a; bx, by = b
+    return (ax+(bx-ax)*t, ay+(by-ay)*t)
+
+def perp_unit(a: _Vec, b: _Vec) -> _Vec:
+    ax, ay = a; bx, by = b
+    dx, dy = bx-ax, by-ay
+    L = _hypot(dx, dy) or 1.0
     return (-dy/L, dx/L)
 
-def dot(a,b): return a[0]*b[0] + a[1]*b[1]
-def clamp(v,a,b): return max(a, min(b, v))
+def dot(a: _Vec, b: _Vec) -> float:
+    ax, ay = a; bx, by = b
+    return ax*bx + ay*by
+
+def clamp(v, a, b): return a if v < a else (b if v > b else v)
 
-def dist2(p,q): return (p[0]-q[0])**2 + (p[1]-q[1])**2
+def dist2(p: _Vec, q: _Vec) -> float:
+    dx = p[0]-q[0]; dy = p[1]-q[1]
+    return dx*dx + dy*dy
 
-def seg_dist_to_point_sq(a,b,p):
-    ap = (p[0]-a[0], p[1]-a[1]); ab = (b[0]-a[0], b[1]-a[1])
-    ab2 = ab[0]*ab[0] + ab[1]*ab[1]
-    if ab2 == 0: return dist2(a,p)
-    t = clamp(dot(ap,ab)/ab2, 0.0, 1.0)
-    proj = (a[0]+ab[0]*t, a[1]+ab[1]*t)
-    return dist2(proj, p)
+def seg_dist_to_point_sq(a: _Vec, b: _Vec, p: _Vec) -> float:
+    ax, ay = a; bx, by = b; px, py = p
+    abx = bx-ax; aby = by-ay
+    ab2 = abx*abx + aby*aby
+    if ab2 == 0:
+        dx = px-ax; dy = py-ay
+        return dx*dx + dy*dy
+    t = ((px-ax)*abx + (py-ay)*aby) / ab2
+    if t < 0.0: t = 0.0
+    elif t > 1.0: t = 1.0
+    dx = ax + abx*t - px; dy = ay + aby*t - py
+    return dx*dx + dy*dy
+
+def clip_segment_convex(a, b, poly):
+    """Cyrus-Beck: clip segment a-b to convex polygon; returns (p, q) or None."""
+    n = len(poly)
+    cx = sum(v[0] for v in poly) / n; cy = sum(v[1] for v in poly) / n
+    dx, dy = b[0]-a[0], b[1]-a[1]
+    t0, t1 = 0.0, 1.0
+    for i in range(n):
+        p, q = poly[i], poly[(i+1) % n]
+        nx, ny = p[1]-q[1], q[0]-p[0]
+        if nx*(cx-p[0]) + ny*(cy-p[1]) < 0:
+            nx, ny = -nx, -ny   # make normal point inward
+        num = nx*(a[0]-p[0]) + ny*(a[1]-p[1])
+        den = nx*dx + ny*dy
+        if den == 0:
+            if num < 0: return None
+            continue
+        t = -num / den
+        if den > 0: t0 = max(t0, t)
+        else:       t1 = min(t1, t)
+        if t0 > t1: return None
+    return lerp(a, b, t0), lerp(a, b, t1)
@@ -1,9 +1,15 @@
-from PIL import Image, ImageDraw, ImageOps
+from PIL import Image, ImageDraw
 import math
 from typing import List, Tuple, Dict
-from .fonts import load_font
+from .fonts import load_font, draw_text_cached, text_bbox
+from .geom import clip_segment_convex
 
 SQ3 = math.sqrt(3)
+SQ3_2 = SQ3 / 2
+
+# unit offsets of a flat-top hex's six corners; scaled/translated per cell
+UNIT_HEX = tuple((math.cos(k), math.sin(k))
+                 for k in (0, math.pi/3, 2*math.pi/3, math.pi, 4*math.pi/3, 5*math.pi/3))
 
 class HexGrid:
     """
@@ -11,8 +17,10 @@ class HexGrid:
       - centers: list[(x,y)] of usable small-hex centers (inside big hex)
       - nodes: list of dicts with {'q','r','x','y'}
       - node_lookup[(q,r)] -> (x,y)
+      - node_at[(x,y)] -> (q,r) (reverse of node_lookup)
       - neighbors(q,r) -> list[(q,r)] existing neighbors
-      - diamond_r: last-used diamond radius (px) for edge anchoring
+      - adjacency[(q,r)] -> tuple of neighbors, precomputed per geometry
+      - diamond_r: diamond radius (px) for the current cell size, used for edge anchoring
     """
     def __init__(self, cells_across=6, diamond_scale=0.55):
         self.cells_across = int(max(2, cells_across))
@@ -21,18 +29,26 @@ class HexGrid:
         self.centers: List[Tuple[int,int]] = []
         self.nodes: List[Dict] = []
         self.node_lookup: Dict[Tuple[int,int], Tuple[int,int]] = {}
+        self.node_at: Dict[Tuple[int,int], Tuple[int,int]] = {}
+        self.adjacency: Dict[Tuple[int,int], Tuple[Tuple[int,int], ...]] = {}
+        # integer node ids for A*: id -> (q, r), (q, r) -> id, id -> neighbor ids.
+        # ids follow center order, which is (q, r)-sorted, so comparing ids
+        # breaks heap ties the same way comparing (q, r) tuples does.
+        self.node_qr: List[Tuple[int,int]] = []
+        self.node_index: Dict[Tuple[int,int], int] = {}
+        self.adjacency_idx: List[Tuple[int, ...]] = []
         self.big_hex = (0, 0, 0)
         self.cell_size = 0.0
+        self._line_mask = None   # (geometry key, origin, 1-bit ink mask)
         self.font_num = load_font(16)
 
     # ----- math helpers (flat-top) -----
     def _hex_poly(self, xc, yc, r):
-        return [(xc + r*math.cos(k), yc + r*math.sin(k))
-                for k in (0, math.pi/3, 2*math.pi/3, math.pi, 4*math.pi/3, 5*math.pi/3)]
+        return [(xc + r*ux, yc + r*uy) for ux, uy in UNIT_HEX]
 
     def point_in_hex(self, cx, cy, R, x, y):
         px = abs(x - cx); py = abs(y - cy)
-        if px > R or py > R * SQ3 / 2 + 1: 
+        if px > R or py > R * SQ3_2 + 1:
             return False
         return (SQ3 * px + py) <= SQ3 * R + 1
 
@@ -58,69 +74,122 @@ class HexGrid:
         C = self.cells_across
         s = (4.0 * R) / (3.0 * C + 1.0) * 0.985
         self.cell_size = s
+        self.diamond_r = int(max(8, s * self.diamond_scale))
+
+        # lines, nodes and adjacency depend only on the geometry: rebuild
+        # them when it changes, otherwise just blit the cached line mask
+        key = (cx, cy, R, C)
+        if self._line_mask is None or self._line_mask[0] != key:
+            all_centers = self._candidate_centers(cx, cy, R, s)
+            self._line_mask = (key,) + self._rasterize_lines(all_centers, cx, cy, R, s)
+            self._build_nodes(all_centers, cx, cy, R, s)
+        _, origin, mask = self._line_mask
+        draw.bitmap(origin, mask, fill=0)
+
+        return self.centers, (cx, cy, R)
 
+    def _candidate_centers(self, cx, cy, R, s):
+        """Axial (x, y, q, r) candidates whose cells can reach the big hex."""
         # axial scan window big enough, then filter to big hex
         q_max = int(R / (1.5 * s)) + 3
         r_max = int(R / (SQ3 * s)) + 3
 
+        # per column, only scan the r-band that can reach the big hex
+        # (half-height plus one cell); order stays q-major/r-minor so
+        # center indices persisted in hex JSON remain stable
+        dx, dy = 1.5 * s, SQ3 * s
+        band = (R * SQ3 / 2 + s) / dy
         all_centers = []
-        nodes = []
         for q in range(-q_max, q_max + 1):
-            for r in range(-r_max, r_max + 1):
-                x = cx + (1.5 * s) * q
-                y = cy + (SQ3 * s) * (r + q / 2.0)
-                all_centers.append((x, y, q, r))
-
-        # build mask of the big hex
-        mask = Image.new("1", draw.im.size, 0)
-        md   = ImageDraw.Draw(mask)
-        big  = self._hex_poly(cx, cy, R)
-        md.polygon(big, fill=1, outline=1)
-
-        # draw all small hex outlines on a temp layer
-        grid = Image.new("1", draw.im.size, 1)
-        gd   = ImageDraw.Draw(grid)
-        for (x, y, _, _) in all_centers:
-            gd.polygon(self._hex_poly(x, y, s), outline=0)
-
-        # clip outlines & paint
-        clipped = Image.new("L", draw.im.size, 255)
-        clipped.paste(grid.convert("L"), (0, 0), mask.convert("L"))
-        lines = ImageOps.invert(clipped).point(lambda p: 255 if p > 128 else 0)
-        draw.bitmap((0, 0), lines.convert("1"), fill=0)
-        draw.polygon(big, outline=0)
-
+            x = cx + dx * q
+            r_lo = max(-r_max, math.floor(-q / 2.0 - band))
+            r_hi = min(r_max, math.ceil(-q / 2.0 + band))
+            for r in range(r_lo, r_hi + 1):
+                all_centers.append((x, cy + dy * (r + q / 2.0), q, r))
+        return all_centers
+
+    def _build_nodes(self, all_centers, cx, cy, R, s):
         # keep only centers truly inside (margin so diamonds/trails don't bleed)
         self.nodes.clear()
         self.node_lookup.clear()
+        self.node_at.clear()
         self.centers.clear()
-        for (_, (x, y, q, r)) in enumerate(all_centers):
-            if self.point_in_hex(cx, cy, R - s * 1.2, x, y):
-                self.nodes.append({'q': q, 'r': r, 'x': int(x), 'y': int(y)})
-                self.node_lookup[(q, r)] = (int(x), int(y))
-                self.centers.append((int(x), int(y)))
-
-        return self.centers, (cx, cy, R)
+        # point_in_hex inlined with its limits hoisted: this runs per candidate
+        node_R = R - s * 1.2
+        lim_y, lim_d = node_R * SQ3_2 + 1, SQ3 * node_R + 1
+        for (x, y, q, r) in all_centers:
+            if ((px := abs(x - cx)) <= node_R and (py := abs(y - cy)) <= lim_y
+                    and SQ3 * px + py <= lim_d):
+                ix, iy = int(x), int(y)
+                self.nodes.append({'q': q, 'r': r, 'x': ix, 'y': iy})
+                self.node_lookup[(q, r)] = (ix, iy)
+                self.node_at[(ix, iy)] = (q, r)
+                self.centers.append((ix, iy))
+        # neighbor tuples for A*, in AXIAL_DIRS order (routing draws jitter
+        # per neighbor, so the order must match neighbors())
+        self.adjacency = {qr: tuple(self.neighbors(*qr)) for qr in self.node_lookup}
+        self.node_qr = list(self.node_lookup)
+        self.node_index = {qr: i for i, qr in enumerate(self.node_qr)}
+        self.adjacency_idx = [tuple(self.node_index[n] for n in self.adjacency[qr])
+                              for qr in self.node_qr]
+
+    def _rasterize_lines(self, all_centers, cx, cy, R, s):
+        """
+        Small hex edges (clipped analytically to the big hex for cells
+        straddling its border) plus the big hex outline, as an ink mask.
+        Edges are keyed on rounded pixel endpoints: interior edges are shared
+        by two cells, so each unique edge is stroked exactly once.
+        Returns (origin, mask) for draw.bitmap.
+        """
+        big = self._hex_poly(cx, cy, R)
+        edges = set()
+        # point_in_hex limits for the outer (R+s) and inner (R-s) tests
+        out_R, in_R = R + s, R - s
+        out_y, out_d = out_R * SQ3_2 + 1, SQ3 * out_R + 1
+        in_y, in_d = in_R * SQ3_2 + 1, SQ3 * in_R + 1
+        for (x, y, _, _) in all_centers:
+            px, py = abs(x - cx), abs(y - cy)
+            if px > out_R or py > out_y or SQ3 * px + py > out_d:
+                continue
+            poly = self._hex_poly(x, y, s)
+            inside = px <= in_R and py <= in_y and SQ3 * px + py <= in_d
+            for a, b in zip(poly, poly[1:] + poly[:1]):
+                if not inside:
+                    seg = clip_segment_convex(a, b, big)
+                    if not seg:
+                        continue
+                    a, b = seg
+                ka = (round(a[0]), round(a[1])); kb = (round(b[0]), round(b[1]))
+                edges.add((ka, kb) if ka <= kb else (kb, ka))
+
+        ox, oy = cx - R - 2, cy - R - 2
+        mask = Image.new("1", (2 * R + 5, 2 * R + 5), 0)
+        md = ImageDraw.Draw(mask)
+        for (ax, ay), (bx, by) in edges:
+            md.line(((ax - ox, ay - oy), (bx - ox, by - oy)), fill=1)
+        md.polygon([(x - ox, y - oy) for x, y in big], outline=1)
+        return (ox, oy), mask
 
     # ----- render helpers -----
-    def draw_diamond(self, draw: ImageDraw.ImageDraw, x: int, y: int, text):
-        r = int(max(8, self.cell_size * self.diamond_scale))
-        self.diamond_r = r
-        draw.polygon([(x, y-r), (x+r, y), (x, y+r), (x-r, y)], fill=0, outline=0)
+    def draw_diamond(self, draw: ImageDraw.ImageDraw, x: int, y: int, text, poly=None):
+        # poly: optional precomputed outline (top, right, bottom, left)
+        if poly is None:
+            r = self.diamond_r
+            poly = [(x, y-r), (x+r, y), (x, y+r), (x-r, y)]
+        draw.polygon(poly, fill=0, outline=0)
         label = str(text)
-        bbox = draw.textbbox((0, 0), label, font=self.font_num)
+        bbox = text_bbox(label, self.font_num)
         tw, th = bbox[2]-bbox[0], bbox[3]-bbox[1]
         draw.text((x - tw/2, y - th/2), label, font=self.font_num, fill=1)
 
     def draw_compass(self, draw: ImageDraw.ImageDraw, cx: int, cy: int, size=20, font=None):
-        from .fonts import load_font
         w = max(3, size//3)
         draw.polygon([(cx,cy-size),(cx-w,cy-w),(cx+w,cy-w)], fill=0)
         draw.polygon([(cx,cy+size),(cx-w,cy+w),(cx+w,cy+w)], fill=0)
         draw.polygon([(cx-size,cy),(cx-w,cy-w),(cx-w,cy+w)], fill=0)
         draw.polygon([(cx+size,cy),(cx+w,cy-w),(cx+w,cy+w)], fill=0)
         f = font or load_font(14)
-        draw.text((cx-5,cy-size-14),"N",font=f,fill=0)
-        draw.text((cx-5,cy+size+2),"S",font=f,fill=0)
-        draw.text((cx-size-12,cy-6),"W",font=f,fill=0)
-        draw.text((cx+size+6, cy-6),"E",font=f,fill=0)
+        draw_text_cached(draw, (cx-5,cy-size-14), "N", f)
+        draw_text_cached(draw, (cx-5,cy+size+2), "S", f)
+        draw_text_cached(draw, (cx-size-12,cy-6), "W", f)
+        draw_text_cached(draw, (cx+size+6, cy-6), "E", f)
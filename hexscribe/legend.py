@@ -1,5 +1,8 @@
 # hexscribe/legend.py
-from PIL import ImageDraw
+from PIL import Image, ImageChops, ImageDraw
+from .fonts import default_font, text_bbox
+
+LABELS = ("Path", "Difficult", "Dangerous", "Special")
 
 class TrailLegend:
     """
@@ -12,6 +15,7 @@ class TrailLegend:
         self.icon_h = 22
         self.row_gap = 8
         self.icon_gap = 8   # space between text and icon
+        self._tile = None   # (mask, icon_x_in_tile), built on first draw
 
     # --- icon helpers ---
     def _draw_icon_box(self, d: ImageDraw.ImageDraw, x, y, w, h):
@@ -24,16 +28,13 @@ class TrailLegend:
         if dist <= 1e-6:
             return
         ux, uy = dx / dist, dy / dist
-        pos = 0.0
-        draw_on = True
-        while pos < dist:
-            seg = min(dash if draw_on else gap, dist - pos)
-            if draw_on:
-                sx, sy = x1 + ux * pos, y1 + uy * pos
-                ex, ey = x1 + ux * (pos + seg), y1 + uy * (pos + seg)
-                d.line([(sx, sy), (ex, ey)], fill=0, width=width)
-            pos += seg
-            draw_on = not draw_on
+        # one dash per period, clipped to the end; no gap bookkeeping
+        start, period = 0.0, dash + gap
+        while start < dist:
+            end = min(start + dash, dist)
+            d.line([(x1 + ux * start, y1 + uy * start),
+                    (x1 + ux * end, y1 + uy * end)], fill=0, width=width)
+            start += period
 
     def _draw_path_icon(self, d, x, y, w, h):
         cy = y + h // 2
@@ -85,25 +86,38 @@ class TrailLegend:
         right_target = max(panel_right_inner, hex_right_edge + push_from_hex)
         x_icon = right_target - self.icon_w
 
-        labels  = ["Path", "Difficult", "Dangerous", "Special"]
-        drawers = [self._draw_path_icon,
-                   self._draw_difficult_icon,
-                   self._draw_danger_icon,
-                   self._draw_special_icon]
-
         # Vertical placement
         needed_h = self.icon_h * 4 + self.row_gap * 3
         top_y = min(panel_bottom - needed_h,
                     hex_center_y + hex_R - self.icon_h - 18)
         top_y = max(top_y, hex_center_y - hex_R + top_min_above_hex)
 
-        y = top_y
-        for label, draw_icon in zip(labels, drawers):
-            tw = d.textbbox((0, 0), label)[2]
-            th = d.textbbox((0, 0), label)[3]
+        # legend content never changes: rasterize it once, then just blit
+        if self._tile is None:
+            self._tile = self._render_tile(needed_h)
+        mask, tile_icon_x = self._tile
+        d.bitmap((x_icon - tile_icon_x, top_y), mask, fill=0)
+
+    def _render_tile(self, needed_h: int):
+        """Labels + icons drawn once at origin; returns (ink mask, icon x)."""
+        font = default_font()
+        drawers = [self._draw_path_icon,
+                   self._draw_difficult_icon,
+                   self._draw_danger_icon,
+                   self._draw_special_icon]
+
+        sizes = [text_bbox(label, font)[2:] for label in LABELS]
+        x_icon = max(tw for tw, _ in sizes) + self.icon_gap
+
+        tile = Image.new("1", (x_icon + self.icon_w + 1, needed_h + 1), 1)
+        d = ImageDraw.Draw(tile)
+        y = 0
+        for label, draw_icon, (tw, th) in zip(LABELS, drawers, sizes):
             tx = x_icon - self.icon_gap - tw
             ty = y + (self.icon_h - th) // 2
-            d.text((tx, ty), label, fill=0)
+            d.text((tx, ty), label, font=font, fill=0)
             self._draw_icon_box(d, x_icon, y, self.icon_w, self.icon_h)
             draw_icon(d, x_icon, y, self.icon_w, self.icon_h)
             y += self.icon_h + self.row_gap
+        # ink mask: black pixels -> 1 (ImageChops.invert doesn't flip "1" images)
+        return ImageChops.logical_xor(tile, Image.new("1", tile.size, 1)), x_icon
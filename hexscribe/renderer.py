@@ -1,13 +1,16 @@
 # hexscribe/renderer.py
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageChops, ImageDraw, ImageFont
 from typing import List, Tuple, Optional, Callable
 import random
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 
 from .hexgrid import HexGrid
 from .trails import TrailRouter
 from .legend import TrailLegend
 from .layout import UILayout
+from .fonts import text_bbox
 
 
 
@@ -16,15 +19,23 @@ def _fonts_root() -> Path:
     # HEXSCRIBE/fonts/
     return Path(__file__).resolve().parents[1] / "fonts"
 
-def _load_var_font(name: str, size: int):
+@lru_cache(maxsize=None)
+def _font_path(name: str) -> Optional[str]:
     p = _fonts_root() / name
-    if p.exists():
+    return str(p) if p.exists() else None
+
+def _load_var_font(name: str, size: int):
+    # always a fresh instance: callers may set variation axes on it
+    p = _font_path(name)
+    if p:
         try:
-            return ImageFont.truetype(str(p), size=size)
+            return ImageFont.truetype(p, size=size)
         except Exception:
             return None
     return None
 
+# Fonts below are cached and shared across renders; don't mutate them.
+@lru_cache(maxsize=256)
 def _jost(size: int, weight: int):
     """
     Load Jost variable font at a specific wght (100–900).
@@ -40,18 +51,66 @@ def _jost(size: int, weight: int):
         pass
     return f
 
+def _jost_extrabold(size: int):
+    return _jost(size, 850)
+
+def _jost_semibold(size: int):
+    return _jost(size, 600)
+
+@lru_cache(maxsize=64)
 def _libre_caslon(size: int):
     f = _load_var_font("LibreCaslonText-Regular.ttf", size)
     return f or ImageFont.load_default()
 
 
+# ---------- Text layout cache ----------
+# metrics-only draw; "1" mode so bboxes match what render() measures
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("1", (1, 1)))
+
+# keyed on the font object itself: that hits only because the font makers
+# above are lru_cached singletons (it can't key on path/size, since the Jost
+# weights share both), and those fonts stay alive for the process anyway
+@lru_cache(maxsize=256)
+def _wrap_lines(text: str, font, max_px: int) -> Tuple[str, ...]:
+    """Greedy word wrap to max_px; cached since descriptions rarely change."""
+    words = text.split()
+    lines, cur = [], []
+    for w in words:
+        cand = (" ".join(cur + [w])).strip()
+        if not cand:
+            cur = [w]; continue
+        b = _MEASURE_DRAW.textbbox((0, 0), cand, font=font)
+        if b[2] - b[0] <= max_px or not cur:
+            cur = cand.split()
+        else:
+            lines.append(" ".join(cur))
+            cur = [w]
+    if cur:
+        lines.append(" ".join(cur))
+    return tuple(lines) or ("(description placeholder)",)
+
+@lru_cache(maxsize=256)
+def _fit_font_cached(text: str, maker, max_width: int, max_size: int, min_size: int):
+    """Largest maker(size) in [min_size, max_size] whose text fits max_width."""
+    # width grows with size, so bisect instead of stepping down one size at a time
+    lo, hi = min_size, max_size   # answer lies in [lo, hi]; min_size is the floor
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        b = text_bbox(text, maker(mid))
+        if b[2] - b[0] <= max_width:
+            lo = mid
+        else:
+            hi = mid - 1
+    return maker(lo)
+
+
 class HexScreenRenderer:
     """
     Renders the Hex Scrawl screen with interactivity.
     - Title/Type: Jost variable (ExtraBold/SemiBold), dynamic width fit
     - Body: Libre Caslon Text (left-aligned, 1.5x line spacing)
     - Diamonds: numbers in Jost ExtraBold (white), perfectly centered
-    - Trails: drawn FIRST; diamonds/numbers redrawn ON TOP to prevent overlap
+    - Trails: drawn FIRST; diamonds/numbers drawn once ON TOP to prevent overlap
     """
 
     def __init__(self, layout: UILayout = UILayout()):
@@ -70,6 +129,17 @@ class HexScreenRenderer:
         self.router = TrailRouter()
         self.legend = TrailLegend()
 
+        # persistent 1-bit canvas, reset from the base layer by every render()
+        self._canvas = Image.new("1", (self.W, self.H), 1)
+        # scratch canvas for trail routing + all-white reference for its ink mask
+        self._trail_scratch = Image.new("1", (self.W, self.H), 1)
+        self._white = Image.new("1", (self.W, self.H), 1)
+        # frame + left header/description + grid lines for one (hex_id, description)
+        self._base: Optional[Tuple[tuple, Image.Image]] = None
+        # trail ink per layout: key -> (origin, 1-bit mask) or None if no ink
+        self._trail_cache: "OrderedDict[tuple, Optional[tuple]]" = OrderedDict()
+        self._trail_cache_size = 4
+
         # last-frame state
         self.last_diamonds: List[Tuple[int, int, int]] = []
         self.last_marks: List[Tuple[int, int]] = []
@@ -78,44 +148,26 @@ class HexScreenRenderer:
 
     # ---------- text helpers ----------
     def _measure(self, d: ImageDraw.ImageDraw, text: str, font):
-        b = d.textbbox((0, 0), text, font=font)
+        # metrics only depend on (text, font); shared cache across frames
+        b = text_bbox(text, font)
         return b[2] - b[0], b[3] - b[1]
 
     def _wrap(self, d: ImageDraw.ImageDraw, text: str, font, max_px: int):
-        words = (text or "").split()
-        lines, cur = [], []
-        for w in words:
-            cand = (" ".join(cur + [w])).strip()
-            if not cand:
-                cur = [w]; continue
-            tw, _ = self._measure(d, cand, font)
-            if tw <= max_px or not cur:
-                cur = cand.split()
-            else:
-                lines.append(" ".join(cur))
-                cur = [w]
-        if cur:
-            lines.append(" ".join(cur))
-        return lines or ["(description placeholder)"]
+        return list(_wrap_lines(text or "", font, max_px))
 
     def _fit_font(self, d: ImageDraw.ImageDraw, text: str, maker, max_width: int, max_size: int, min_size: int):
-        size = max_size
-        while size > min_size:
-            f = maker(size)
-            w, _ = self._measure(d, text, f)
-            if w <= max_width:
-                return f
-            size -= 1
-        return maker(min_size)
+        # maker must be a stable function (not a per-call lambda) for the cache to hit
+        return _fit_font_cached(text, maker, max_width, max_size, min_size)
 
     # ---------- draw helpers ----------
     def _draw_cursor(self, d: ImageDraw.ImageDraw, x: int, y: int, r: int):
         R = int(r + 6)
         d.ellipse([x - R, y - R, x + R, y + R], outline=0, width=2)
 
-    def _draw_centered_diamond_number(self, d: ImageDraw.ImageDraw, x: int, y: int, r: int, text: str, font):
+    def _draw_centered_diamond_number(self, d: ImageDraw.ImageDraw, x: int, y: int, r: int, text: str, font, poly=None):
         # Mask interior (remove any previous label) and redraw outline for crisp edges
-        poly = [(x, y - r), (x + r, y), (x, y + r), (x - r, y)]
+        if poly is None:
+            poly = [(x, y - r), (x + r, y), (x, y + r), (x - r, y)]
         d.polygon(poly, fill=0)
         d.line(poly + [poly[0]], fill=0, width=2)
         # Centered white number
@@ -125,21 +177,12 @@ class HexScreenRenderer:
             tw, th = self._measure(d, text, font)
             d.text((x - tw//2, y - th//2), text, font=font, fill=1)
 
-    # ---------- main render ----------
-    def render(self,
-               hex_id: str,
-               description: str,
-               features,  # kept for API compat (unused)
-               marks: Optional[List[Tuple[int, int]]] = None,
-               selected_idx: Optional[int] = None,
-               feature_picker: Optional[Callable[[int], dict]] = None,
-               text_scroll: int = 0):
-        """
-        Added: text_scroll -> line offset for the right-pane text box.
-        """
+    # ---------- cached layers ----------
+    def _render_base(self, hex_id: str, description: str) -> Image.Image:
+        """Frame, left header, description and grid lines on a fresh canvas."""
         L = self.L
-        img = Image.new("1", (self.W, self.H), 1)
-        d   = ImageDraw.Draw(img)
+        base = Image.new("1", (self.W, self.H), 1)
+        d = ImageDraw.Draw(base)
 
         # frame + split
         d.rectangle([L.margin, L.margin, self.W - L.margin, self.H - L.margin], outline=0, width=2)
@@ -150,8 +193,8 @@ class HexScreenRenderer:
         right_x = L.split_x - L.right_pad
         max_px  = right_x - left_x
         center_x = (left_x + right_x) // 2
-        
-        left_title_font = self._fit_font(d, f"HEX:{hex_id}", lambda s: _jost(s, 850), max_width=max_px, max_size=self.font_left_title_size, min_size=14)
+
+        left_title_font = self._fit_font(d, f"HEX:{hex_id}", _jost_extrabold, max_width=max_px, max_size=self.font_left_title_size, min_size=14)
         title = f"HEX:{hex_id}"
         title_w, th = self._measure(d, title, left_title_font)
         d.text((center_x - title_w//2, L.margin + L.top_pad), title, font=left_title_font, fill=0)
@@ -159,16 +202,17 @@ class HexScreenRenderer:
         # left description (centered with buffer)
         y = L.margin + L.top_pad + th + 12
         line_gap = 1.4
+        line_step = int(self._measure(d, "Ag", self.font_body)[1] * line_gap)
         wrapped_lines = self._wrap(d, description, self.font_body, max_px)
         for line in wrapped_lines:
             line_w, _ = self._measure(d, line, self.font_body)
             d.text((center_x - line_w//2, y), line, font=self.font_body, fill=0)
-            y += int(self._measure(d, "Ag", self.font_body)[1] * line_gap)
+            y += line_step
 
         grid_top = y + L.hex_inset_top
 
         # hex grid
-        centers, (cx, cy, R) = self.grid.draw_grid(
+        self.grid.draw_grid(
             d,
             left=L.margin + L.left_pad + L.hex_inset_sides,
             top=grid_top,
@@ -176,63 +220,109 @@ class HexScreenRenderer:
             bottom=self.H - L.margin - L.hex_inset_bottom
         )
 
-        # diamonds (layout)
-        diamond_centers: List[Tuple[int, int]] = []
-        labels: List[int] = []
+        return base
+
+    def _trail_layer(self, chosen_marks, diamonds):
+        """
+        Trail ink for this layout as (origin, 1-bit mask), or None if no ink.
+        Routing is seeded from the marks, so the layer is cached per layout.
+        """
+        marks_key = tuple(chosen_marks)
+        key = (marks_key, self.grid.big_hex, self.grid.diamond_r)
+        if key in self._trail_cache:
+            self._trail_cache.move_to_end(key)
+            return self._trail_cache[key]
+
+        layer = self._trail_scratch
+        layer.paste(1, (0, 0, self.W, self.H))
+        # private RNG with the historical seed: same routes, no global state.
+        # Only computed on a cache miss; don't swap the hash for another
+        # digest, or every saved hex would re-route its trails.
+        rng = random.Random(hash(marks_key) & 0xFFFFFFFF)
+        self.router._grid_ref = self.grid
+        self.router.draw_trails(
+            ImageDraw.Draw(layer),
+            diamond_centers=[(x, y) for x, y, _ in diamonds],
+            diamond_radius=self.grid.diamond_r,  # geometry radius
+            max_trails=4,
+            rng=rng,
+        )
+        # ink mask: black pixels -> 1, cropped to the trails
+        ink = ImageChops.logical_xor(layer, self._white)
+        bbox = ink.getbbox()
+        entry = (bbox[:2], ink.crop(bbox)) if bbox else None
+
+        self._trail_cache[key] = entry
+        if len(self._trail_cache) > self._trail_cache_size:
+            self._trail_cache.popitem(last=False)
+        return entry
+
+    # ---------- main render ----------
+    def render(self,
+               hex_id: str,
+               description: str,
+               features,  # kept for API compat (unused)
+               marks: Optional[List[Tuple[int, int]]] = None,
+               selected_idx: Optional[int] = None,
+               feature_picker: Optional[Callable[[int], dict]] = None,
+               text_scroll: int = 0):
+        """
+        Added: text_scroll -> line offset for the right-pane text box.
+        The returned image is the renderer's own canvas and is overwritten by
+        the next render(); .copy() it if you need to keep a frame around.
+        """
+        L = self.L
+        img = self._canvas
+        # everything up to the grid only changes with hex_id/description
+        base_key = (hex_id, description)
+        if self._base is None or self._base[0] != base_key:
+            self._base = (base_key, self._render_base(hex_id, description))
+        img.paste(self._base[1])
+        d   = ImageDraw.Draw(img)
+        centers = self.grid.centers
+        cx, cy, R = self.grid.big_hex
+
+        # diamonds (layout); grid centers are already ints
+        diamonds: List[Tuple[int, int, int]] = []    # (x, y, label)
         chosen_marks: List[Tuple[int, int]] = []  # (center_index, label)
 
         if marks:
             for idx, label in marks:
                 if 0 <= idx < len(centers):
                     x, y = centers[idx]
-                    # initial draw (will be redrawn on top after trails)
-                    self.grid.draw_diamond(d, int(x), int(y), int(label))
-                    diamond_centers.append((int(x), int(y)))
-                    labels.append(int(label))
-                    chosen_marks.append((int(idx), int(label)))
+                    label = int(label)
+                    diamonds.append((x, y, label))
+                    chosen_marks.append((int(idx), label))
         else:
             k = random.randint(3, min(6, len(centers)))
             picked = random.sample(range(len(centers)), k)
             for idx in picked:
                 x, y = centers[idx]
                 label = random.randint(1, 5)
-                self.grid.draw_diamond(d, int(x), int(y), label)
-                diamond_centers.append((int(x), int(y)))
-                labels.append(label)
+                diamonds.append((x, y, label))
                 chosen_marks.append((idx, label))
 
-        # remember
-        self.last_diamonds = [(x, y, lab) for (x, y), lab in zip(diamond_centers, labels)]
-        self.last_marks = chosen_marks[:]
+        # remember (both lists are fresh per render, no copy needed)
+        self.last_diamonds = diamonds
+        self.last_marks = chosen_marks
 
         # TRAILS FIRST (deterministic per layout)
-        import random as _random
-        _state = _random.getstate()
-        try:
-            _seed = hash(tuple(chosen_marks)) & 0xFFFFFFFF
-            _random.seed(_seed)
-            self.router._grid_ref = self.grid
-            self.router.draw_trails(
-                d,
-                diamond_centers=diamond_centers,
-                diamond_radius=self.grid.diamond_r,  # geometry radius
-                max_trails=4,
-            )
-        finally:
-            _random.setstate(_state)
-
-        # Bring diamonds back on TOP so trails never overlap them
-        for (x, y), lab in zip(diamond_centers, labels):
-            self.grid.draw_diamond(d, int(x), int(y), int(lab))
-
-        # Numbers (white) centered on top
+        trails = self._trail_layer(chosen_marks, diamonds)
+        if trails is not None:
+            d.bitmap(trails[0], trails[1], fill=0)
+
+        # Diamonds + numbers in one pass ON TOP so trails never overlap them;
+        # the rhombus offsets are shared by every diamond
+        r = int(self.grid.diamond_r)
+        offs = ((0, -r), (r, 0), (0, r), (-r, 0))
         num_font = _jost(int(self.grid.diamond_r * 1.2), 850)
-        for (x, y), lab in zip(diamond_centers, labels):
-            self._draw_centered_diamond_number(d, int(x), int(y), int(self.grid.diamond_r), str(lab), num_font)
+        for x, y, lab in diamonds:
+            poly = [(x + dx, y + dy) for dx, dy in offs]
+            self._draw_centered_diamond_number(d, x, y, r, str(lab), num_font, poly=poly)
 
         # cursor highlight
-        if selected_idx is not None and 0 <= selected_idx < len(diamond_centers):
-            sx, sy = diamond_centers[selected_idx]
+        if selected_idx is not None and 0 <= selected_idx < len(diamonds):
+            sx, sy, _ = diamonds[selected_idx]
             self._draw_cursor(d, sx, sy, self.grid.diamond_r)
 
         # compass
@@ -253,9 +343,9 @@ class HexScreenRenderer:
 
         # feature dict from picker (JSON-driven in your runner)
         feature_dict = None
-        if feature_picker and selected_idx is not None and 0 <= selected_idx < len(labels):
+        if feature_picker and selected_idx is not None and 0 <= selected_idx < len(diamonds):
             try:
-                feature_dict = feature_picker(int(labels[selected_idx]))
+                feature_dict = feature_picker(diamonds[selected_idx][2])
             except Exception:
                 feature_dict = None
         if not feature_dict:
@@ -266,8 +356,8 @@ class HexScreenRenderer:
         body_text = feature_dict.get("text","")
 
         # Fit and draw centered title/type using Jost weights
-        name_font = self._fit_font(d, name_text, lambda s: _jost(s, 850), panel_width, self.font_right_title_size, 14)
-        type_font = self._fit_font(d, type_text, lambda s: _jost(s, 600), panel_width, self.font_type_size, 10)
+        name_font = self._fit_font(d, name_text, _jost_extrabold, panel_width, self.font_right_title_size, 14)
+        type_font = self._fit_font(d, type_text, _jost_semibold, panel_width, self.font_type_size, 10)
 
         # Title
         name_w, name_h = self._measure(d, name_text, name_font)
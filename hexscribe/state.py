@@ -2,7 +2,18 @@
 from __future__ import annotations
 import json
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+# optional fast path; same on-disk format as the stdlib fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# hex_id -> ((mtime_ns, size), parsed dict). load_hex hands out the cached
+# dict itself, which is the live state the runners mutate and save_hex back;
+# the stat signature catches writes from elsewhere (e.g. the AI pipeline).
+_hex_mem_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
 
 def project_root() -> Path:
     # Root of your project (one level above the hexscribe package)
@@ -16,24 +27,48 @@ def data_dir() -> Path:
 def hex_path(hex_id: str) -> Path:
     return data_dir() / f"{hex_id}.json"
 
+def _signature(p: Path) -> Tuple[int, int]:
+    st = p.stat()
+    return st.st_mtime_ns, st.st_size
+
 def load_hex(hex_id: str) -> Dict[str, Any] | None:
+    """Return the cached dict for hex_id, not a copy.
+
+    Repeated loads hand back the same object until the file changes on disk,
+    so unsaved edits a caller makes are visible to every later load_hex.
+    Callers that need a scratch copy should copy.deepcopy() the result.
+    """
     p = hex_path(hex_id)
-    if not p.exists():
+    try:
+        sig = _signature(p)
+    except OSError:
+        _hex_mem_cache.pop(hex_id, None)
         return None
+    hit = _hex_mem_cache.get(hex_id)
+    if hit is not None and hit[0] == sig:
+        return hit[1]
     try:
-        return json.loads(p.read_text(encoding="utf-8"))
+        raw = p.read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
     except Exception:
         return None
+    _hex_mem_cache[hex_id] = (sig, data)
+    return data
 
 def save_hex(hex_data: Dict[str, Any]) -> None:
     hex_id = hex_data.get("hex_id", "UNKNOWN")
     p = hex_path(hex_id)
     p.parent.mkdir(parents=True, exist_ok=True)
     tmp = p.with_suffix(".json.tmp")
-    tmp.write_text(json.dumps(hex_data, indent=2, ensure_ascii=False), encoding="utf-8")
+    if orjson is not None:
+        tmp.write_bytes(orjson.dumps(hex_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        tmp.write_text(json.dumps(hex_data, indent=2, ensure_ascii=False), encoding="utf-8")
     tmp.replace(p)
+    _hex_mem_cache[hex_id] = (_signature(p), hex_data)
 
 def delete_hex(hex_id: str) -> None:
+    _hex_mem_cache.pop(hex_id, None)
     p = hex_path(hex_id)
     if p.exists():
         p.unlink()
@@ -1,18 +1,27 @@
 import math, heapq, random
-from typing import List, Tuple, Dict, Set
+from collections import defaultdict
+from typing import List, Tuple, Dict, Optional, Set
 from PIL import ImageDraw
 from .hexgrid import HexGrid
 
 # keep spacing between trails so they don't pile up
 NO_OVERLAP_DIST = 14  # px
 
+# trail style for each d8 roll (index 0 unused)
+STYLE_BY_ROLL = (None, "path", "path", "path", "path",
+                 "difficult", "difficult", "dangerous", "special")
+
+# Chaikin corner-cut weights (near, far) — each cut point is a fixed blend
+CHAIKIN_W = (0.75, 0.25)
+
 def _perp_unit(a, b):
     dx, dy = b[0] - a[0], b[1] - a[1]
     L = math.hypot(dx, dy) or 1.0
     return (-dy / L, dx / L)
 
-def _dist(a, b):
-    return math.hypot(b[0] - a[0], b[1] - a[1])
+def _ipts(pts):
+    """Truncate to int pixels up front — the same quantization Pillow applies."""
+    return [(int(x), int(y)) for x, y in pts]
 
 
 class TrailRouter:
@@ -26,19 +35,21 @@ class TrailRouter:
       - special   : dashed line (8/6)
     """
     def __init__(self):
+        self._rng = random   # replaced per draw_trails call when an rng is given
         self.samples_log: List[Tuple[str, List[Tuple[float, float]]]] = []
-        self.used_edges: Set[Tuple[Tuple[int, int], Tuple[int, int]]] = set()
+        self.used_edges: Set[Tuple[int, int]] = set()   # node-id pairs, low id first
 
     # ---------- style picker ----------
     def _style(self) -> str:
-        r = random.randint(1, 8)
-        if   1 <= r <= 4: return "path"
-        elif 5 <= r <= 6: return "difficult"
-        elif r == 7:      return "dangerous"
-        else:             return "special"
+        # d8: 1-4 path, 5-6 difficult, 7 dangerous, 8 special
+        return STYLE_BY_ROLL[self._rng.randint(1, 8)]
 
     # ---------- grid helpers ----------
     def _closest_node(self, grid: HexGrid, x: int, y: int) -> Tuple[int, int]:
+        # diamonds sit exactly on grid centers, so this is normally a hit
+        hit = grid.node_at.get((x, y))
+        if hit is not None:
+            return hit
         best, bd = None, 10**9
         for n in grid.nodes:
             d2 = (n['x'] - x) ** 2 + (n['y'] - y) ** 2
@@ -47,52 +58,64 @@ class TrailRouter:
                 best = (n['q'], n['r'])
         return best
 
-    def _edge_key(self, a: Tuple[int, int], b: Tuple[int, int]):
-        return tuple(sorted([a, b]))
+    def _edge_key(self, a: int, b: int):
+        return (a, b) if a <= b else (b, a)
 
     # ---------- A* ----------
     def _astar(self, grid: HexGrid,
                start: Tuple[int, int], goal: Tuple[int, int],
                blocked: Set[Tuple[int, int]]) -> List[Tuple[int, int]]:
 
-        def h(p):
-            (q1, r1), (q2, r2) = p, goal
-            # hex distance
-            return (abs(q1 - q2) + abs((q1 + r1) - (q2 + r2)) + abs(r1 - r2)) / 2
-
-        openq = [(0.0, start)]
-        came: Dict[Tuple[int, int], Tuple[int, int]] = {}
-        g = {start: 0.0}
+        # search over integer node ids: list slots instead of hashed (q, r) keys
+        index, node_qr = grid.node_index, grid.node_qr
+        adjacency = grid.adjacency_idx
+        src, dst = index[start], index[goal]
+        blocked_ids = {index[n] for n in blocked if n in index}
+        q2, r2 = goal
+        s2 = q2 + r2
+
+        # expansion order (and so the jitter draws) must stay exactly as is:
+        # routes are seeded per layout and saved hexes expect the same trails
+        used_edges, uniform = self.used_edges, self._rng.uniform
+        push, pop = heapq.heappush, heapq.heappop
+        openq = [(0.0, src)]
+        n = len(node_qr)
+        came = [-1] * n
+        g = [1e9] * n
+        g[src] = 0.0
 
         while openq:
-            _, cur = heapq.heappop(openq)
-            if cur == goal:
-                path = [cur]
-                while cur in came:
+            _, cur = pop(openq)
+            if cur == dst:
+                path = [node_qr[cur]]
+                while came[cur] >= 0:
                     cur = came[cur]
-                    path.append(cur)
+                    path.append(node_qr[cur])
                 return list(reversed(path))
 
-            for nbr in grid.neighbors(*cur):
-                if nbr in blocked:
+            g_cur = g[cur]
+            for nbr in adjacency[cur]:
+                if nbr in blocked_ids:
                     continue
                 step = 1.0
                 # discourage reusing the same corridor
-                if self._edge_key(cur, nbr) in self.used_edges:
+                if ((cur, nbr) if cur < nbr else (nbr, cur)) in used_edges:
                     step += 2.0
-                step += random.uniform(0.0, 0.25)  # variety
+                step += uniform(0.0, 0.25)  # variety
 
-                ng = g[cur] + step
-                if ng < g.get(nbr, 1e9):
+                ng = g_cur + step
+                if ng < g[nbr]:
                     g[nbr] = ng
-                    heapq.heappush(openq, (ng + h(nbr), nbr))
+                    q1, r1 = node_qr[nbr]
+                    # hex distance heuristic, inlined
+                    push(openq, (ng + (abs(q1 - q2) + abs(q1 + r1 - s2) + abs(r1 - r2)) / 2, nbr))
                     came[nbr] = cur
         return []
 
     # ---------- polyline helpers ----------
     def _poly_from_axial(self, grid: HexGrid, path_ax: List[Tuple[int, int]]):
-        return [(float(grid.node_lookup[(q, r)][0]),
-                 float(grid.node_lookup[(q, r)][1])) for q, r in path_ax]
+        lookup = grid.node_lookup
+        return [(float(x), float(y)) for x, y in (lookup[p] for p in path_ax)]
 
     def _trim_to_diamond_edge(self, center, toward, radius_px):
         ax, ay = center; bx, by = toward
@@ -105,14 +128,14 @@ class TrailRouter:
         """Chaikin corner-cutting; preserves endpoints."""
         if len(pts) < 3:
             return pts[:]
+        wn, wf = CHAIKIN_W
         out = pts[:]
         for _ in range(iters):
             newp = [out[0]]
-            for i in range(len(out) - 1):
-                a, b = out[i], out[i + 1]
-                q = (0.75 * a[0] + 0.25 * b[0], 0.75 * a[1] + 0.25 * b[1])
-                r = (0.25 * a[0] + 0.75 * b[0], 0.25 * a[1] + 0.75 * b[1])
-                newp.extend([q, r])
+            add = newp.append
+            for (ax, ay), (bx, by) in zip(out, out[1:]):
+                add((wn * ax + wf * bx, wn * ay + wf * by))
+                add((wf * ax + wn * bx, wf * ay + wn * by))
             newp.append(out[-1])
             out = newp
         return out
@@ -122,19 +145,22 @@ class TrailRouter:
         if len(pts) < 2:
             return pts[:]
         acc = [pts[0]]
+        add = acc.append
+        ax, ay = pts[0]          # always equal to acc[-1]
         carry = 0.0
-        for i in range(len(pts) - 1):
-            a = acc[-1]; b = pts[i + 1]
-            seg = _dist(a, b)
+        for bx, by in pts[1:]:
+            dx, dy = bx - ax, by - ay
+            seg = math.hypot(dx, dy)
             if seg <= 1e-6:
                 continue
-            dirx = (b[0] - a[0]) / seg; diry = (b[1] - a[1]) / seg
+            dirx = dx / seg; diry = dy / seg
             t = step - carry
             while t <= seg:
-                acc.append((a[0] + dirx * t, a[1] + diry * t))
+                add((ax + dirx * t, ay + diry * t))
                 t += step
             carry = seg - (t - step)
-            acc[-1] = (b[0], b[1])
+            acc[-1] = (bx, by)
+            ax, ay = bx, by
         return acc
 
     # ---------- drawing with avoidance ----------
@@ -142,22 +168,34 @@ class TrailRouter:
                 avoid_circles: List[Tuple[int, int, float]]):
 
         # main stroke
-        d.line(pts, fill=0, width=2)
-
-        def _near_any_circle(p, pad=0.0):
-            x, y = p
-            for cx, cy, r in avoid_circles:
-                if (x - cx) * (x - cx) + (y - cy) * (y - cy) <= (r + pad) * (r + pad):
+        d.line(_ipts(pts), fill=0, width=2)
+
+        # ornaments are computed first and stroked together at the end;
+        # Pillow has no multi-segment primitive, so this is one line() each
+        ornaments: List[List[Tuple[int, int]]] = []
+        add = ornaments.append
+
+        # every ornament test uses a 4px pad: square the radii once per trail
+        circles = [(cx, cy, (r + 4.0) * (r + 4.0)) for cx, cy, r in avoid_circles]
+        hypot = math.hypot
+        (sx, sy), (ex, ey) = pts[0], pts[-1]
+
+        def _near_any_circle(x, y):
+            for cx, cy, r2 in circles:
+                dx = x - cx; dy = y - cy
+                if dx * dx + dy * dy <= r2:
                     return True
             return False
 
-        def _safe_positions(step_pts, edge_clear=10.0):
+        def _near_end(x, y, clear=10.0):
+            return hypot(x - sx, y - sy) < clear or hypot(x - ex, y - ey) < clear
+
+        def _safe_positions(step_pts):
             safe = []
             for i in range(1, len(step_pts) - 1):
                 c = step_pts[i]
-                if _near_any_circle(c, pad=4.0):
-                    continue
-                if _dist(c, pts[0]) < edge_clear or _dist(c, pts[-1]) < edge_clear:
+                x, y = c
+                if _near_any_circle(x, y) or _near_end(x, y):
                     continue
                 safe.append((i, c))
             return safe
@@ -167,8 +205,8 @@ class TrailRouter:
             for i, c in _safe_positions(step_pts):
                 p = step_pts[i - 1]; q = step_pts[i + 1]
                 nx, ny = _perp_unit(p, q); tick = 5
-                d.line([(c[0] - nx * tick, c[1] - ny * tick),
-                        (c[0] + nx * tick, c[1] + ny * tick)], fill=0, width=2)
+                add(_ipts([(c[0] - nx * tick, c[1] - ny * tick),
+                           (c[0] + nx * tick, c[1] + ny * tick)]))
 
         elif style == "dangerous":
             step_pts = self._evenly_sample(pts, step=14)
@@ -181,43 +219,73 @@ class TrailRouter:
                 barb = 6
                 left  = (c[0] - ux * barb + nx * barb, c[1] - uy * barb + ny * barb)
                 right = (c[0] - ux * barb - nx * barb, c[1] - uy * barb - ny * barb)
-                if not (_near_any_circle(left, 4.0) or _near_any_circle(right, 4.0)):
-                    d.line([left, c, right], fill=0, width=2)
+                if not (_near_any_circle(*left) or _near_any_circle(*right)):
+                    add(_ipts([left, c, right]))
 
         elif style == "special":
             # dashed stroke: 8px dash / 6px gap, skipping near diamonds/endpoints
             dash_len, gap = 8.0, 6.0
-            for i in range(len(pts) - 1):
-                a, b = pts[i], pts[i + 1]
-                seg_len = _dist(a, b)
+            # the dash pattern restarts on every segment and the old on/off
+            # toggle advanced a full dash+gap per step, so only every other
+            # stride ever drew: step straight to those
+            stride = 2.0 * (dash_len + gap)
+            for (ax, ay), (bx, by) in zip(pts, pts[1:]):
+                seg_len = math.hypot(bx - ax, by - ay)
                 if seg_len <= 1e-6:
                     continue
-                ux = (b[0] - a[0]) / seg_len
-                uy = (b[1] - a[1]) / seg_len
+                ux = (bx - ax) / seg_len
+                uy = (by - ay) / seg_len
                 pos = 0.0
-                draw_dash = True
                 while pos < seg_len:
-                    s = (a[0] + ux * pos, a[1] + uy * pos)
                     epos = min(seg_len, pos + dash_len)
-                    e = (a[0] + ux * epos, a[1] + uy * epos)
-                    mid = ((s[0] + e[0]) / 2, (s[1] + e[1]) / 2)
-                    near_end = _dist(mid, pts[0]) < 10.0 or _dist(mid, pts[-1]) < 10.0
-                    if draw_dash and not near_end:
-                        if not any((mid[0] - cx) ** 2 + (mid[1] - cy) ** 2 <= (r + 4.0) ** 2
-                                   for cx, cy, r in avoid_circles):
-                            d.line([s, e], fill=0, width=2)
-                    pos += dash_len + gap
-                    draw_dash = not draw_dash
+                    x0, y0 = ax + ux * pos, ay + uy * pos
+                    x1, y1 = ax + ux * epos, ay + uy * epos
+                    mx, my = (x0 + x1) / 2, (y0 + y1) / 2
+                    if not (_near_end(mx, my) or _near_any_circle(mx, my)):
+                        add([(int(x0), int(y0)), (int(x1), int(y1))])
+                    pos += stride
+
+        line = d.line
+        for seg in ornaments:
+            line(seg, fill=0, width=2)
+
+    def _far_from_existing(self, poly, existing_samples) -> bool:
+        """True if no point of poly is within NO_OVERLAP_DIST of an accepted sample."""
+        md2 = NO_OVERLAP_DIST ** 2
+        # smoothed samples are dense, so group them by cell and gather the
+        # 3x3 neighbourhood once per cell rather than once per sample
+        by_cell: Dict[Tuple[int, int], List[Tuple[float, float]]] = defaultdict(list)
+        for (x, y) in poly:
+            by_cell[(int(x // NO_OVERLAP_DIST), int(y // NO_OVERLAP_DIST))].append((x, y))
+        get = existing_samples.get
+        for (gx, gy), pts in by_cell.items():
+            near = [e for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                    for e in get((gx + dx, gy + dy), ())]
+            if not near:
+                continue
+            # cheap reject: nothing in range of this cell's points' bounding box
+            xs = [x for x, _ in pts]; ys = [y for _, y in pts]
+            x0, x1 = min(xs) - NO_OVERLAP_DIST, max(xs) + NO_OVERLAP_DIST
+            y0, y1 = min(ys) - NO_OVERLAP_DIST, max(ys) + NO_OVERLAP_DIST
+            near = [(ex, ey) for ex, ey in near if x0 < ex < x1 and y0 < ey < y1]
+            for (x, y) in pts:
+                for (ex, ey) in near:
+                    dx = x - ex; dy = y - ey
+                    if dx * dx + dy * dy < md2:
+                        return False
+        return True
 
     # ---------- public API ----------
     def draw_trails(self,
                     d: ImageDraw.ImageDraw,
                     diamond_centers: List[Tuple[int, int]],
                     diamond_radius: float,
-                    max_trails: int = 4):
+                    max_trails: int = 4,
+                    rng: Optional[random.Random] = None):
         """
         Route up to max_trails trails strictly between diamonds, avoiding
-        other diamonds and reusing edges only when needed.
+        other diamonds and reusing edges only when needed. Output depends only
+        on the arguments and the rng (global random if None), not on earlier calls.
         """
         if len(diamond_centers) < 2:
             return
@@ -226,22 +294,29 @@ class TrailRouter:
 
         grid: HexGrid = self._grid_ref
 
+        # corridor penalties and the log are per call: the same layout must
+        # route the same way no matter what was drawn before it
+        self.used_edges.clear()
+        self.samples_log.clear()
+        self._rng = rng if rng is not None else random
+
         # map diamonds to axial nodes
         diamonds_ax = [self._closest_node(grid, x, y) for (x, y) in diamond_centers]
 
         # choose connections
         pts = diamonds_ax[:]
-        random.shuffle(pts)
+        self._rng.shuffle(pts)
         upper = min(max_trails, len(pts) - 1)
         segs = 2 if upper >= 2 else upper
         if upper > 2:
-            segs = random.randint(2, upper)
+            segs = self._rng.randint(2, upper)
 
         # obstacles: all diamonds except endpoints
         all_blocked = set(diamonds_ax)
         avoid_circles = [(x, y, diamond_radius + 2) for (x, y) in diamond_centers]
 
-        existing_samples: List[Tuple[float, float]] = []
+        # accepted trail samples bucketed into NO_OVERLAP_DIST cells
+        existing_samples: Dict[Tuple[int, int], List[Tuple[float, float]]] = defaultdict(list)
 
         for i in range(segs):
             a = pts[i]; b = pts[i + 1]
@@ -265,23 +340,17 @@ class TrailRouter:
             poly[-1] = self._trim_to_diamond_edge(poly[-1], poly[-2], diamond_radius)
 
             # spacing guard vs other trails
-            if existing_samples:
-                md2 = NO_OVERLAP_DIST ** 2
-                ok = True
-                for (x, y) in poly:
-                    for (ex, ey) in existing_samples:
-                        if (x - ex) ** 2 + (y - ey) ** 2 < md2:
-                            ok = False; break
-                    if not ok: break
-                if not ok:
-                    continue
+            if existing_samples and not self._far_from_existing(poly, existing_samples):
+                continue
 
             # draw with style & avoidance
             self._stroke(d, poly, style, avoid_circles)
-            existing_samples.extend(poly)
+            for (x, y) in poly:
+                existing_samples[(int(x // NO_OVERLAP_DIST), int(y // NO_OVERLAP_DIST))].append((x, y))
 
             # penalize corridor reuse
-            for u, v in zip(path_ax[:-1], path_ax[1:]):
+            ids = [grid.node_index[n] for n in path_ax]
+            for u, v in zip(ids[:-1], ids[1:]):
                 self.used_edges.add(self._edge_key(u, v))
 
             self.samples_log.append((style, poly))
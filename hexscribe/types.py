@@ -20,24 +20,35 @@ FEATURE_TYPES: List[Tuple[str, str]] = [
 LABEL_TO_KEY: Dict[str, str] = {label: key for key, label in FEATURE_TYPES}
 KEY_TO_LABEL: Dict[str, str] = {key: label for key, label in FEATURE_TYPES}
 
-COLUMNS = [
-    ("Mystic", [
+# picker columns; tuples so the shared table can't be edited in place
+COLUMNS: Tuple[Tuple[str, Tuple[Tuple[str, str], ...]], ...] = (
+    ("Mystic", (
         ("place_of_power",    "Place of Power"),
         ("mystical_meddling", "Mystical Meddling"),
         ("portal",            "Portal"),
         ("passage",           "Passage"),
-    ]),
-    ("Danger", [
+    )),
+    ("Danger", (
         ("hazard",   "Hazard"),
         ("dungeon",  "Dungeon"),
         ("lair",     "Lair"),
-    ]),
-    ("Civilization", [
+    )),
+    ("Civilization", (
         ("outpost",   "Outpost"),
         ("village",   "Village"),
         ("town",      "Town"),
         ("city",      "City"),
         ("landmark",  "Landmark"),
         ("attraction","Attraction"),
-    ]),
-]
+    )),
+)
+
+# rows per picker column, in COLUMNS order
+COLUMN_LENS: Tuple[int, ...] = tuple(len(items) for _, items in COLUMNS)
+
+KEY_TO_COLUMN: Dict[str, str] = {key: col for col, items in COLUMNS for key, _ in items}
+COLUMN_TO_KEYS: Dict[str, Tuple[str, ...]] = {col: tuple(key for key, _ in items) for col, items in COLUMNS}
+# key -> (column index, row index) in the picker grid
+KEY_TO_CELL: Dict[str, Tuple[int, int]] = {
+    key: (ci, ri) for ci, (_, items) in enumerate(COLUMNS) for ri, (key, _) in enumerate(items)
+}
@@ -1,16 +1,22 @@
 # run_interactive.py (ordered LR / TB navigation)
-import sys, math, pygame
+import sys, math, queue, threading, pygame
+from collections import OrderedDict
+from concurrent.futures import Future, wait as wait_futures
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
 from hexscribe import HexScreenRenderer, UILayout
 from hexscribe.state import load_hex, save_hex, delete_hex
-from hexscribe.types import COLUMNS, KEY_TO_LABEL
+from hexscribe.types import COLUMNS, COLUMN_LENS, KEY_TO_CELL, KEY_TO_LABEL
 
 from hexscribe.ai.feature_description_ai import generate_feature_description
 
 HEX_ID = "1106"
 
+# main loop: wakes on input (capped at MAX_FPS) or every IDLE_WAIT_MS
+MAX_FPS, IDLE_WAIT_MS = 60, 100
+
 UNKNOWN_FEATURE = {
     "name": "Unknown",
     "type": "Unexplored",
@@ -18,9 +24,16 @@ UNKNOWN_FEATURE = {
     "category": "",
 }
 
+def _iso_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+@lru_cache(maxsize=1)
 def fonts_root() -> Path:
     return Path(__file__).resolve().parent / "fonts"
 
+# one Font per (file, size, style) for the whole session: every ExploreModal
+# shares them instead of re-parsing the TTFs on open
+@lru_cache(maxsize=64)
 def load_pygame_font(name: str, size: int, bold=False, italic=False) -> "pygame.font.Font":
     path = fonts_root() / name
     if path.exists():
@@ -36,12 +49,12 @@ def make_json_feature_picker(hex_data_ref, selected_index_ref):
         hex_data = hex_data_ref[0]
         sel = selected_index_ref[0]
         if not hex_data or "diamonds" not in hex_data:
-            return {"name":"Unknown","type":"Unexplored","text":"Press Enter to explore.","category":""}
+            return UNKNOWN_FEATURE
         if sel is None or sel < 0 or sel >= len(hex_data["diamonds"]):
-            return {"name":"Unknown","type":"Unexplored","text":"Press Enter to explore.","category":""}
+            return UNKNOWN_FEATURE
         d = hex_data["diamonds"][sel]
         if d.get("status") != "discovered":
-            return {"name":"Unknown","type":"Unexplored","text":"Press Enter to explore.","category":""}
+            return UNKNOWN_FEATURE
         return {
             "name": d.get("name") or "(unnamed)",
             "type": d.get("type") or "",
@@ -66,6 +79,61 @@ def _ai_rewrite_text(raw_text: str, *, use_ai: bool = True, tone: str | None = N
         print(f"[AI fallback] {e}")
         return raw_text
 
+# the LLM rewrite takes seconds: it runs on one worker thread while the map
+# stays live, and the diamond shows the raw notes until the rewrite lands.
+# The worker is a daemon so quitting never blocks on a slow model; main()
+# gives in-flight rewrites AI_QUIT_WAIT_S to land, then drops the rest.
+AI_QUIT_WAIT_S = 5.0
+
+def _ai_worker(jobs):
+    while True:
+        fut, raw_text, tone = jobs.get()
+        if not fut.set_running_or_notify_cancel():
+            continue
+        try:
+            fut.set_result(_ai_rewrite_text(raw_text, tone=tone))
+        except Exception as e:
+            fut.set_exception(e)
+
+@lru_cache(maxsize=1)
+def _ai_jobs() -> queue.Queue:
+    jobs = queue.Queue()
+    threading.Thread(target=_ai_worker, args=(jobs,), name="ai-rewrite", daemon=True).start()
+    return jobs
+
+def _start_ai_rewrite(pending, hex_data, d, raw_text, *, use_ai: bool = True, tone: str | None = None) -> str:
+    """Queue a rewrite of d's notes; returns the text to store until it finishes."""
+    raw_text = (raw_text or "").strip()
+    if raw_text and use_ai:
+        fut = Future()
+        _ai_jobs().put((fut, raw_text, tone))
+        pending.append((hex_data, d, raw_text, fut))
+    return raw_text
+
+def _finish_ai_rewrites(pending, hex_data) -> bool:
+    """Store finished rewrites into hex_data (and save); True if anything changed."""
+    changed = False
+    for job in [j for j in pending if j[3].done()]:
+        pending.remove(job)
+        owner, d, raw_text, fut = job
+        # dropped if the hex was reset or the notes were edited again since
+        if owner is hex_data and d.get("text") == raw_text:
+            d["text"] = fut.result()
+            changed = True
+    if changed:
+        hex_data["updated_at"] = _iso_now()
+        save_hex(hex_data)
+    return changed
+
+def _drain_ai_rewrites(pending, hex_data, timeout_s: float = AI_QUIT_WAIT_S) -> None:
+    """On quit: save rewrites that land within timeout_s; the rest are dropped (raw notes stay saved)."""
+    if not pending:
+        return
+    wait_futures([j[3] for j in pending], timeout=timeout_s)
+    _finish_ai_rewrites(pending, hex_data)
+    if pending:
+        print(f"[AI] dropped {len(pending)} unfinished rewrite(s); raw notes are kept")
+
 class ExploreModal:
     def __init__(self, screen, ui, deck_value: int, initial=None):
         self.screen = screen
@@ -91,49 +159,133 @@ class ExploreModal:
         self.pad = 10
         self.line_gap = 6
 
-        for ci, (_title, items) in enumerate(COLUMNS):
-            for ri, (key, _label) in enumerate(items):
-                if key == self.type_key:
-                    self.col_idx, self.row_idx = ci, ri
+        # (font, text, color) -> rendered Surface, LRU: static labels stay hot
+        # while each keystroke's new last note line pushes out stale ones
+        self._surf_cache = OrderedDict()
+        self._surf_cache_max = 512
+        # (text, font, max_w) -> wrapped lines; notes only change on a keystroke
+        self._wrap_cache = {}
+        self._wrap_cache_max = 16
+        # (paragraph, font, max_w) -> its lines; typing only re-wraps the
+        # paragraph being edited, the rest come from here
+        self._para_cache = {}
+        self._para_cache_max = 256
+        # text blits for the frame being drawn, issued in one screen.blits()
+        # after the shapes (text always sits on top of boxes/bars/markers)
+        self._text_blits = []
+        # title -> pre-drawn panel chrome (one per step)
+        self._chrome_cache = {}
+
+        if self.type_key in KEY_TO_CELL:
+            self.col_idx, self.row_idx = KEY_TO_CELL[self.type_key]
+
+        # step-2 picker: item positions never change
+        self._picker = self._picker_layout()
+        self._picker_surf = None
 
     def _wrap(self, text, font, max_w):
-        out, cur = [], ""
+        key = (text, font, max_w)
+        lines = self._wrap_cache.get(key)
+        if lines is None:
+            if len(self._wrap_cache) >= self._wrap_cache_max:
+                del self._wrap_cache[next(iter(self._wrap_cache))]   # oldest first
+            lines = self._wrap_cache[key] = self._wrap_uncached(text, font, max_w)
+        return lines
+
+    def _wrap_uncached(self, text, font, max_w):
+        # paragraphs wrap independently of each other
+        out = []
         for para in text.split("\n"):
-            cur = ""
-            for w in para.split(" "):
-                test = (cur + " " + w).strip()
-                if font.size(test)[0] <= max_w:
-                    cur = test
-                else:
-                    if cur: out.append(cur)
-                    cur = w
-            out.append(cur)
+            key = (para, font, max_w)
+            lines = self._para_cache.get(key)
+            if lines is None:
+                if len(self._para_cache) >= self._para_cache_max:
+                    self._para_cache.clear()
+                lines = self._para_cache[key] = self._wrap_paragraph(para, font, max_w)
+            out.extend(lines)
         return out or [""]
 
+    def _wrap_paragraph(self, para, font, max_w):
+        out, cur = [], ""
+        for w in para.split(" "):
+            test = (cur + " " + w).strip()
+            if font.size(test)[0] <= max_w:
+                cur = test
+            else:
+                if cur: out.append(cur)
+                cur = w
+        out.append(cur)
+        return tuple(out)
+
+    def _picker_layout(self):
+        """Per column: (title, x, title_y, [(label, y), ...]) in the step-2 panel."""
+        inner = self._panel_rect().inflate(-6, -6)
+        y = inner.y + 44 + self.pad          # below the title bar (see _draw_panel)
+        col_w = (inner.w - 2*self.pad) // 3
+        title_h = self.font_cat.get_height() + 6
+        item_h = self.font_item.get_height() + 6
+        layout = []
+        for ci, (title, items) in enumerate(COLUMNS):
+            cx = inner.x + self.pad + ci*col_w + 6
+            layout.append((title, cx, y, [(label, y + title_h + ri*item_h) for ri, (_, label) in enumerate(items)]))
+        return layout
+
+    def _picker_panel(self):
+        """Step-2 chrome with every column title and label pre-drawn; only the cursor moves."""
+        if self._picker_surf is None:
+            ox, oy = self._panel_rect().topleft
+            surf = self._panel_chrome("Choose a Feature Type").copy()
+            for title, cx, ty, items in self._picker:
+                surf.blit(self._text_surface(title, self.font_cat), (cx - ox, ty - oy))
+                for label, iy in items:
+                    surf.blit(self._text_surface(label, self.font_item), (cx + 12 - ox, iy - oy))
+            self._picker_surf = surf
+        return self._picker_surf
+
     def _panel_rect(self):
         W, H = self.screen.get_size()
         return pygame.Rect((W-500)//2, (H-300)//2, 500, 300)
 
+    def _panel_chrome(self, title):
+        """Border, white body, title bar and title for one step, as one Surface."""
+        chrome = self._chrome_cache.get(title)
+        if chrome is None:
+            w, h = self._panel_rect().size
+            chrome = pygame.Surface((w, h))
+            # black panel, white inner = 3px border
+            chrome.fill((0,0,0))
+            chrome.fill((255,255,255), pygame.Rect(3, 3, w - 6, h - 6))
+            chrome.fill((0,0,0), pygame.Rect(3, 3, w - 6, 44))
+            ty = 3 + (44 - self.font_title.get_height())//2
+            chrome.blit(self._text_surface(title, self.font_title, (255,255,255)), (3 + 12, ty))
+            self._chrome_cache[title] = chrome
+        return chrome
+
     def _draw_panel(self, title):
         rect = self._panel_rect()
         self.rect = rect
-        pygame.draw.rect(self.screen, (0,0,0), rect, 3)
+        self.screen.blit(self._panel_chrome(title), rect.topleft)
         inner = rect.inflate(-6, -6)
-        pygame.draw.rect(self.screen, (255,255,255), inner)
-        bar = pygame.Rect(inner.x, inner.y, inner.w, 44)
-        pygame.draw.rect(self.screen, (0,0,0), bar)
-        tx = bar.x + 12
-        ty = bar.y + (bar.h - self.font_title.get_height())//2
-        self.screen.blit(self.font_title.render(title, False, (255,255,255)), (tx, ty))
-        return inner.x + self.pad, bar.bottom + self.pad, inner
+        return inner.x + self.pad, inner.y + 44 + self.pad, inner
+
+    def _text_surface(self, txt, font, color=(0,0,0)):
+        key = (font, txt, color)
+        surf = self._surf_cache.get(key)
+        if surf is not None:
+            self._surf_cache.move_to_end(key)
+            return surf
+        surf = self._surf_cache[key] = font.render(txt, False, color)
+        if len(self._surf_cache) > self._surf_cache_max:
+            self._surf_cache.popitem(last=False)
+        return surf
 
     def _blit(self, txt, x, y, font, color=(0,0,0)):
-        surf = font.render(txt, False, color)
-        self.screen.blit(surf, (x, y)); return surf.get_width(), surf.get_height()
+        surf = self._text_surface(txt, font, color)
+        self._text_blits.append((surf, (x, y))); return surf.get_width(), surf.get_height()
 
     def _blit_in_box(self, text, box, font):
         pad = 8
-        wrapped = self._wrap(text, font, box.w - 2*pad)
+        wrapped = self._wrap(text, font, box.w - 2*pad)   # shared: don't mutate
         ty = box.y + pad
         line_h = font.get_height() + 3
         max_lines = max(1, (box.h - 2*pad) // line_h)
@@ -149,7 +301,7 @@ class ExploreModal:
 
         x0 = box.x + pad
         for ln in lines:
-            self.screen.blit(font.render(ln, False, (0,0,0)), (x0, ty))
+            self._text_blits.append((self._text_surface(ln, font), (x0, ty)))
             ty += line_h
 
     def _handle_text_input(self, current, event, limit):
@@ -160,11 +312,14 @@ class ExploreModal:
         return current
 
     def run(self):
-        clock = pygame.time.Clock()
+        # event-driven: sleep until input arrives, redraw only after a change
+        self._dirty = True
         while self.active:
-            for event in pygame.event.get():
+            for event in [pygame.event.wait(100)] + pygame.event.get():
                 if event.type == pygame.QUIT: self.active=False; return None
+                if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE): self._dirty = True
                 if event.type == pygame.KEYDOWN:
+                    self._dirty = True
                     if event.key == pygame.K_ESCAPE: self.active=False; return None
                     if self.step == 0 and event.key in (pygame.K_RETURN, pygame.K_KP_ENTER): self.step = 1
                     elif self.step == 1:
@@ -173,23 +328,29 @@ class ExploreModal:
                         elif event.key == pygame.K_BACKSPACE: self.name = self.name[:-1]
                         elif event.unicode and len(self.name) < 80: self.name += event.unicode
                     elif self.step == 2:
-                        cols = COLUMNS
+                        lens = COLUMN_LENS
                         if event.key in (pygame.K_LEFT, pygame.K_a):
-                            self.col_idx = (self.col_idx - 1) % len(cols); self.row_idx = min(self.row_idx, len(cols[self.col_idx][1]) - 1)
+                            self.col_idx = (self.col_idx - 1) % len(lens); self.row_idx = min(self.row_idx, lens[self.col_idx] - 1)
                         elif event.key in (pygame.K_RIGHT, pygame.K_d):
-                            self.col_idx = (self.col_idx + 1) % len(cols); self.row_idx = min(self.row_idx, len(cols[self.col_idx][1]) - 1)
-                        elif event.key in (pygame.K_UP, pygame.K_w): self.row_idx = (self.row_idx - 1) % len(cols[self.col_idx][1])
-                        elif event.key in (pygame.K_DOWN, pygame.K_s): self.row_idx = (self.row_idx + 1) % len(cols[self.col_idx][1])
+                            self.col_idx = (self.col_idx + 1) % len(lens); self.row_idx = min(self.row_idx, lens[self.col_idx] - 1)
+                        elif event.key in (pygame.K_UP, pygame.K_w): self.row_idx = (self.row_idx - 1) % lens[self.col_idx]
+                        elif event.key in (pygame.K_DOWN, pygame.K_s): self.row_idx = (self.row_idx + 1) % lens[self.col_idx]
                         elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
-                            self.type_key = cols[self.col_idx][1][self.row_idx][0]; self.step = 3
+                            self.type_key = COLUMNS[self.col_idx][1][self.row_idx][0]; self.step = 3
                     elif self.step == 3:
-                        if (event.key in (pygame.K_RETURN, pygame.K_KP_ENTER)) and (pygame.key.get_mods() & pygame.KMOD_CTRL): self.step = 4
+                        if (event.key in (pygame.K_RETURN, pygame.K_KP_ENTER)) and (pygame.key.get_mods() & pygame.KMOD_CTRL):
+                            # name/type are fixed from here on: format the summary once
+                            self._confirm_lines = (f"Name: {self.name}", f"Type: {KEY_TO_LABEL.get(self.type_key, '')}")
+                            self.step = 4
                         else: self.notes = self._handle_text_input(self.notes, event, 4000)
                     elif self.step == 4:
                         if event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
                             return {"name": self.name.strip(), "type": KEY_TO_LABEL.get(self.type_key, ""), "text": self.notes.strip(), "icon": self.type_key}
                         elif event.key == pygame.K_BACKSPACE: self.step = 3
 
+            if not self._dirty:
+                continue
+            self._text_blits.clear()
             if self.step == 0:
                 x, y, inner = self._draw_panel(f"Explore — Draw from Deck {self.deck_value}")
                 self._blit("Draw a card for this diamond's deck.", x, y, self.font_item); y += self.font_item.get_height() + self.line_gap
@@ -201,50 +362,58 @@ class ExploreModal:
                 pygame.draw.line(self.screen, (0,0,0), (inner.x + self.pad, name_y), (inner.x + self.pad + underline_w, name_y), 2)
                 self._blit(self.name or "", inner.x + self.pad, y, self.font_item)
             elif self.step == 2:
-                x, y, inner = self._draw_panel("Choose a Feature Type")
-                cols_area_x = inner.x + self.pad
-                cols_area_w = inner.w - 2*self.pad
-                col_w = cols_area_w // 3
-                for ci, (title, items) in enumerate(COLUMNS):
-                    cx = cols_area_x + ci*col_w + 6
-                    self._blit(title, cx, y, self.font_cat)
-                    iy = y + self.font_cat.get_height() + 6
-                    for ri, (key, label) in enumerate(items):
-                        if ci==self.col_idx and ri==self.row_idx:
-                            tri_size = 8
-                            tri_y = iy + self.font_item.get_height()//2
-                            tri_points = [(cx, tri_y), (cx, tri_y - tri_size), (cx + tri_size, tri_y - tri_size//2)]
-                            pygame.draw.polygon(self.screen, (0,0,0), tri_points)
-                            label_x = cx + tri_size + 4
-                        else:
-                            label_x = cx + 12
-                        self._blit(label, label_x, iy, self.font_item)
-                        iy += self.font_item.get_height() + 6
+                # labels sit at cx + 12 either way (the cursor fills cx..cx+8, +4 gap)
+                self.rect = self._panel_rect()
+                self.screen.blit(self._picker_panel(), self.rect.topleft)
+                tri_size = 8
+                _, cx, _, items = self._picker[self.col_idx]
+                tri_y = items[self.row_idx][1] + self.font_item.get_height()//2
+                tri_points = [(cx, tri_y), (cx, tri_y - tri_size), (cx + tri_size, tri_y - tri_size//2)]
+                pygame.draw.polygon(self.screen, (0,0,0), tri_points)
             elif self.step == 3:
                 x, y, inner = self._draw_panel("Notes / Features")
                 box = pygame.Rect(inner.x + self.pad, y, inner.w - 2*self.pad, inner.h - (y - inner.y) - 46)
-                pygame.draw.rect(self.screen, (255,255,255), box); pygame.draw.rect(self.screen, (0,0,0), box, 2)
+                self.screen.fill((255,255,255), box); pygame.draw.rect(self.screen, (0,0,0), box, 2)
                 self._blit_in_box(self.notes, box, self.font_text)
                 self._blit("Ctrl+Enter to continue", inner.x + self.pad, box.bottom + 6, self.font_hint)
             elif self.step == 4:
                 x, y, inner = self._draw_panel("Confirm")
-                self._blit(f"Name: {self.name}", x, y, self.font_item); y += self.font_item.get_height() + 4
-                from hexscribe.types import KEY_TO_LABEL as K2L
-                self._blit(f"Type: {K2L.get(self.type_key,'')}", x, y, self.font_item)
+                name_line, type_line = self._confirm_lines
+                self._blit(name_line, x, y, self.font_item); y += self.font_item.get_height() + 4
+                self._blit(type_line, x, y, self.font_item)
 
-            pygame.display.flip(); clock.tick(60)
+            self.screen.blits(self._text_blits, doreturn=False)
+            pygame.display.flip(); self._dirty = False
         return None
 
+# 8-bit grayscale palette for preview surfaces
+GRAY_PALETTE = [(i, i, i) for i in range(256)]
+
+def frame_to_surface(img) -> "pygame.Surface":
+    """
+    Renderer frame (mode "1") -> palettized Surface. One byte per pixel and
+    frombuffer shares the bytes instead of copying them (vs RGB + fromstring).
+    """
+    surf = pygame.image.frombuffer(img.convert("L").tobytes(), img.size, "P")
+    surf.set_palette(GRAY_PALETTE)
+    return surf
+
 def compute_lr_tb_order(diamonds_xy):
-    idx_xy = [(i, x, y) for i, (x, y, _) in enumerate(diamonds_xy)]
-    idx_xy.sort(key=lambda t: (t[1], t[2]))  # x asc, then y asc
-    return [i for i, _x, _y in idx_xy]
+    # sort the indices directly (stable): x asc, then y asc
+    return sorted(range(len(diamonds_xy)), key=lambda i: (diamonds_xy[i][0], diamonds_xy[i][1]))
 
 def main():
     pygame.init()
     L = UILayout()
     screen = pygame.display.set_mode((L.width, L.height))
     pygame.display.set_caption(f"HexScrawl — Hex {HEX_ID}")
+    # only queue what the loops (and ExploreModal) handle; mouse motion etc.
+    # is dropped by SDL instead of becoming Python event objects. TEXTINPUT
+    # must stay allowed: pygame fills KEYDOWN.unicode from it, and the
+    # modal's name/notes typing reads that
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.TEXTINPUT,
+                              pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE])
     renderer = HexScreenRenderer(L)
 
     hex_data = load_hex(HEX_ID)
@@ -265,15 +434,26 @@ def main():
 
     USE_AI_PROSE = True
     AI_TONE = None  # e.g., "grimdark", "whimsical"
+    ai_pending = []   # (hex_data, diamond, raw notes, future)
 
     text_scroll = 0  # NEW
 
+    # the map only changes on a keypress (or a new order after a render);
+    # the window is only re-blitted after a new frame or an expose
+    dirty = redraw = True
+    img = pyg_img = None
+    ordered_for = None   # last_diamonds list the current order was built from
+
     running = True
     while running:
-        for event in pygame.event.get():
+        # sleep until input arrives instead of polling
+        for event in [pygame.event.wait(IDLE_WAIT_MS)] + pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                redraw = True
             elif event.type == pygame.KEYDOWN:
+                dirty = True
                 if event.key in (pygame.K_ESCAPE, pygame.K_q):
                     running = False
                 elif event.key in (pygame.K_LEFT,):
@@ -302,7 +482,7 @@ def main():
                         modal = ExploreModal(screen, L, deck_value, initial=initial)
                         result = modal.run()
                         if result:
-                            rewritten_text = _ai_rewrite_text(result["text"], use_ai=USE_AI_PROSE, tone=AI_TONE)
+                            rewritten_text = _start_ai_rewrite(ai_pending, hex_data, d, result["text"], use_ai=USE_AI_PROSE, tone=AI_TONE)
                             d.update({
                                 "status": "discovered",
                                 "name": result["name"],
@@ -310,7 +490,7 @@ def main():
                                 "text": rewritten_text,
                                 "icon": result["icon"],
                             })
-                            hex_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+                            hex_data["updated_at"] = _iso_now()
                             save_hex(hex_data); hex_data_ref[0]=hex_data
                             text_scroll = 0
                 elif event.key in (pygame.K_e,):
@@ -322,46 +502,54 @@ def main():
                             modal = ExploreModal(screen, L, deck_value, initial=initial)
                             result = modal.run()
                             if result:
-                                rewritten_text = _ai_rewrite_text(result["text"], use_ai=USE_AI_PROSE, tone=AI_TONE)
+                                rewritten_text = _start_ai_rewrite(ai_pending, hex_data, d, result["text"], use_ai=USE_AI_PROSE, tone=AI_TONE)
                                 d.update({
                                     "name": result["name"],
                                     "type": result["type"],
                                     "text": rewritten_text,
                                     "icon": result["icon"],
                                 })
-                                hex_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+                                hex_data["updated_at"] = _iso_now()
                                 save_hex(hex_data); hex_data_ref[0]=hex_data
                                 text_scroll = 0
 
-        if getattr(renderer, "last_diamonds", None):
-            new_n = len(renderer.last_diamonds)
-            new_order = compute_lr_tb_order(renderer.last_diamonds) if new_n > 0 else []
+        if ai_pending and _finish_ai_rewrites(ai_pending, hex_data):
+            dirty = True
+
+        # last_diamonds is a fresh list per render: only re-sort after a render
+        diamonds = renderer.last_diamonds
+        if diamonds and diamonds is not ordered_for:
+            ordered_for = diamonds
+            new_order = compute_lr_tb_order(diamonds)
             if new_order != order:
+                dirty = True
                 order = new_order
                 sel_ord = 0
                 sel_actual = order[0] if order else 0
                 text_scroll = 0
 
-        selected_index_ref[0] = sel_actual
-        hex_data_ref[0] = hex_data
-
-        img = renderer.render(
-            hex_id=HEX_ID,
-            description=("Arrows/Numpad to move. Enter to explore. R resets this hex. 9/3 to scroll."),
-            features=[("keep","")],
-            marks=marks,
-            selected_idx=sel_actual,
-            feature_picker=picker,
-            text_scroll=text_scroll,   # NEW: renderer should accept and use this
-        )
+        if dirty:
+            # the picker reads these during render(), and only then
+            selected_index_ref[0] = sel_actual
+            hex_data_ref[0] = hex_data
+            img = renderer.render(
+                hex_id=HEX_ID,
+                description=("Arrows/Numpad to move. Enter to explore. R resets this hex. 9/3 to scroll."),
+                features=[("keep","")],
+                marks=marks,
+                selected_idx=sel_actual,
+                feature_picker=picker,
+                text_scroll=text_scroll,   # NEW: renderer should accept and use this
+            )
 
         if marks is None and renderer.last_marks:
             marks = renderer.last_marks[:]
+            now = _iso_now()
             hex_data = {
                 "hex_id": HEX_ID,
                 "seed": 0,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat(),
+                "created_at": now,
+                "updated_at": now,
                 "diamonds": [
                     {"uid": f"d{i:02d}","center_index": int(ci),"value": int(val),
                      "status": "unknown","name": None,"type": None,"text": None,"icon": None,"tags": []}
@@ -371,7 +559,7 @@ def main():
             }
             save_hex(hex_data); hex_data_ref[0] = hex_data
 
-        if getattr(renderer, "last_diamonds", None):
+        if renderer.last_diamonds:
             if order:
                 sel_ord = max(0, min(sel_ord, len(order)-1))
                 sel_actual = order[sel_ord]
@@ -380,13 +568,19 @@ def main():
         else:
             sel_ord = 0; sel_actual = 0
 
-        rgb = img.convert("RGB")
-        pyg_img = pygame.image.fromstring(rgb.tobytes(), rgb.size, "RGB")
-        screen.blit(pyg_img, (0, 0))
-        pygame.display.flip()
-        clock.tick(60)
-
-    pygame.quit(); sys.exit(0)
+        if dirty:
+            pyg_img = frame_to_surface(img)
+            dirty = False
+            redraw = True
+        if redraw:
+            screen.blit(pyg_img, (0, 0))
+            pygame.display.flip()
+            redraw = False
+        clock.tick(MAX_FPS)
+
+    pygame.quit()
+    _drain_ai_rewrites(ai_pending, hex_data)
+    sys.exit(0)
 
 if __name__ == "__main__":
     main()
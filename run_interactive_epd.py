@@ -9,15 +9,18 @@ HexScribe interactive runner + E-Ink output (UC8179 5.83" 648x480)
 - Partial updates: panel updates only the changed rectangle (cursor/menus) automatically
 """
 
-import sys, time, math, pygame
-from datetime import datetime, timezone
+import os, sys, time, math, queue, threading, pygame
+from collections import OrderedDict
+from concurrent.futures import Future, wait as wait_futures
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
 from PIL import Image, ImageChops, ImageDraw, ImageFont
 
 # ===========================  YOUR APP IMPORTS  ===========================
 from hexscribe import HexScreenRenderer, UILayout
 from hexscribe.state import load_hex, save_hex, delete_hex
-from hexscribe.types import COLUMNS, KEY_TO_LABEL
+from hexscribe.types import COLUMNS, COLUMN_LENS, KEY_TO_CELL, KEY_TO_LABEL
 from hexscribe.ai.feature_description_ai import generate_feature_description
 # ==========================================================================
 
@@ -34,10 +37,28 @@ UNKNOWN_FEATURE = {
 # Proven-good sequence: RESET → 0x06 → 0x04 → (write old/new) → 0x12 → SLEEP
 import spidev, board, digitalio
 
+# libgpiod (v2 bindings) lets _wait block on a BUSY edge instead of polling;
+# without it we fall back to the digitalio 20 ms poll loop.
+try:
+    import gpiod
+    from gpiod.line import Direction as GpiodDirection, Edge as GpiodEdge, Value as GpiodValue
+except ImportError:
+    gpiod = None
+
 PIN_DC, PIN_RST, PIN_BUSY = board.D22, board.D27, board.D17
+# header GPIOs live on gpiochip0 on most Pis; a Pi 5 on an older kernel
+# exposes them elsewhere (e.g. EPD_GPIO_CHIP=/dev/gpiochip4)
+BUSY_GPIO_CHIP = os.environ.get("EPD_GPIO_CHIP", "/dev/gpiochip0")
+BUSY_GPIO_LINE = PIN_BUSY.id   # BCM offset, taken from the pin itself
 W, H = 648, 480
 BUF_BYTES = (W * H) // 8
-SPI_MAX_CHUNK = 4096
+SPI_MAX_CHUNK = 32768
+# UC8179 is rated well past this; drop back to 4_000_000 if long jumper
+# wires start corrupting frames
+SPI_SPEED_HZ = 10_000_000
+SPI_FALLBACK_HZ = 4_000_000   # init() retries at this if POWER_ON never clears
+WHITE_FRAME = bytes([0xFF]) * BUF_BYTES   # "old" frame for every full refresh
+BLACK_FRAME = bytes(BUF_BYTES)
 BUSY_HIGH_IS_BUSY = False  # panel idles HIGH; LOW means "busy"
 
 # Commands
@@ -52,69 +73,112 @@ PARTIAL_OUT               = 0x92
 PARTIAL_WINDOW            = 0x90   # x0 x1 y0 y0 y1 y1 follow
 
 def _send_bytes(spi, b: bytes):
-    for i in range(0, len(b), SPI_MAX_CHUNK):
-        spi.xfer2(list(b[i:i+SPI_MAX_CHUNK]))
+    if isinstance(b, int):
+        b = bytes([b])   # a single data byte, not a length for bytes()
+    elif not isinstance(b, (bytes, bytearray, memoryview)):
+        b = bytes(b)     # small command payloads given as lists
+    # writebytes2 takes any buffer directly (no per-byte int list, and
+    # frame buffers are sliced in place rather than copied)
+    mv = memoryview(b)
+    for i in range(0, len(mv), SPI_MAX_CHUNK):
+        spi.writebytes2(mv[i:i+SPI_MAX_CHUNK])
+
+def _to_ui_1b(img: Image.Image) -> Image.Image:
+    """1-bit, panel-sized, still in UI orientation; skips convert/resize when already so."""
+    if img.mode != "1":
+        img = img.convert("1")
+    if img.size != (W, H):
+        img = img.resize((W, H))
+    return img
+
+def _to_panel_1b(img: Image.Image) -> Image.Image:
+    """1-bit, panel-sized, vertically flipped."""
+    return _to_ui_1b(img).transpose(Image.FLIP_TOP_BOTTOM)
 
 def _pil_to_panel_full(img1b: Image.Image) -> bytes:
     """img1b must be 1-bit, size (W,H), already vertically flipped for panel."""
-    px = img1b.load()
-    out = bytearray(BUF_BYTES); i = 0
-    for y in range(H):
-        b = 0
-        for x in range(W):
-            bit = 7 - (x & 7)
-            if px[x, y] == 0:  # black pixel
-                b |= (1 << bit)
-            if (x & 7) == 7:
-                out[i] = (~b) & 0xFF  # panel expects 1=white, 0=black
-                i += 1
-                b = 0
-        if (W & 7) != 0:
-            out[i] = (~b) & 0xFF; i += 1
-    return bytes(out)
+    # PIL's "1" raw layout is already MSB-first, 1=white, rows padded to a byte
+    # boundary, which is exactly what the panel wants.
+    return img1b.tobytes()
 
 def _pack_region_bits(img1b: Image.Image, x0, y0, x1, y1) -> bytes:
-    """Pack a 1bpp box [x0..x1],[y0..y1] into bytes row by row (left→right)."""
-    w = x1 - x0 + 1
-    h = y1 - y0 + 1
-    out = bytearray(((w + 7)//8) * h)
-    px = img1b.load()
-    i = 0
-    for yy in range(y0, y1+1):
-        byte = 0; bitpos = 7
-        for xx in range(x0, x1+1):
-            if px[xx, yy] == 0:  # black
-                byte |= (1 << bitpos)
-            bitpos -= 1
-            if bitpos < 0:
-                out[i] = (~byte) & 0xFF
-                i += 1
-                byte = 0; bitpos = 7
-        if bitpos != 7:
-            out[i] = (~byte) & 0xFF
-            i += 1
-    return bytes(out)
+    """Pack the panel-space box [x0..x1],[y0..y1] row by row (left→right).
+
+    img1b is the unflipped UI image: only the box itself is cropped and
+    flipped, not the whole frame. x0/x1 must be byte-aligned (show_partial
+    does this), so the raw rows carry no padding bits.
+    """
+    box = img1b.crop((x0, H - 1 - y1, x1 + 1, H - y0))
+    return box.transpose(Image.FLIP_TOP_BOTTOM).tobytes()
 
 class EPD583:
     def __init__(self):
         self.dc   = digitalio.DigitalInOut(PIN_DC);   self.dc.direction   = digitalio.Direction.OUTPUT; self.dc.value = 1
         self.rst  = digitalio.DigitalInOut(PIN_RST);  self.rst.direction  = digitalio.Direction.OUTPUT; self.rst.value = 1
-        self.busy = digitalio.DigitalInOut(PIN_BUSY); self.busy.direction = digitalio.Direction.INPUT
-        self.spi  = spidev.SpiDev(); self.spi.open(0,0); self.spi.max_speed_hz = 4000000; self.spi.mode = 0
+        self.busy = None; self.busy_req = self._request_busy_edges()
+        if self.busy_req is None:
+            self.busy = digitalio.DigitalInOut(PIN_BUSY); self.busy.direction = digitalio.Direction.INPUT
+        self.spi  = spidev.SpiDev(); self.spi.open(0,0); self.spi.max_speed_hz = SPI_SPEED_HZ; self.spi.mode = 0
+        # refreshes block on BUSY for seconds; they run on one worker thread, in
+        # order, so the pygame loop keeps handling keys meanwhile
+        self._jobs = queue.Queue()
+        threading.Thread(target=self._worker, name="epd", daemon=True).start()
+
+    def _worker(self):
+        while True:
+            fn, args = self._jobs.get()
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"[epd] {fn.__name__} failed: {e}")
+            finally:
+                self._jobs.task_done()
+
+    def _submit(self, fn, *args):
+        self._jobs.put((fn, args))
+
+    def idle(self) -> bool:
+        """True once every queued refresh has finished on the panel."""
+        return self._jobs.unfinished_tasks == 0
+
+    def flush(self):
+        self._jobs.join()
 
     def _cmd(self, c): self.dc.value = 0; self.spi.xfer2([c]); self.dc.value = 1
     def _data(self, b): self.dc.value = 1; _send_bytes(self.spi, b)
 
+    def _request_busy_edges(self):
+        if gpiod is None:
+            return None
+        try:
+            return gpiod.request_lines(
+                BUSY_GPIO_CHIP, consumer="epd583-busy",
+                config={BUSY_GPIO_LINE: gpiod.LineSettings(direction=GpiodDirection.INPUT,
+                                                           edge_detection=GpiodEdge.BOTH)})
+        except (OSError, ValueError):
+            return None
+
+    def _busy_raw(self) -> bool:
+        if self.busy_req is not None:
+            return self.busy_req.get_value(BUSY_GPIO_LINE) == GpiodValue.ACTIVE
+        return self.busy.value
+
     def _wait(self, tag, to=45.0):
         t0 = time.time()
         while True:
-            raw = self.busy.value
+            raw = self._busy_raw()
             busy = (raw if BUSY_HIGH_IS_BUSY else (not raw))
             if not busy: return True
-            if time.time() - t0 > to:
+            left = to - (time.time() - t0)
+            if left <= 0:
                 print(f"[warn] timeout {tag}")
                 return False
-            time.sleep(0.02)
+            if self.busy_req is not None:
+                # sleep in the kernel until BUSY toggles (or we time out)
+                if self.busy_req.wait_edge_events(timedelta(seconds=left)):
+                    self.busy_req.read_edge_events()
+            else:
+                time.sleep(0.02)
 
     def _reset(self):
         self.rst.value = 1; time.sleep(0.02)
@@ -122,21 +186,25 @@ class EPD583:
         self.rst.value = 1; time.sleep(0.02)
 
     def init(self):
-        print("[epd] RESET → BOOST → POWER_ON")
+        print(f"[epd] RESET → BOOST → POWER_ON ({self.spi.max_speed_hz} Hz SPI)")
         self._reset()
         self._cmd(BOOSTER_SOFT_START); self._data([0xCF, 0xCE, 0x8D])
-        self._cmd(POWER_ON);           self._wait("POWER_ON", 15.0)
+        self._cmd(POWER_ON)
+        if not self._wait("POWER_ON", 15.0) and self.spi.max_speed_hz > SPI_FALLBACK_HZ:
+            # BUSY never cleared: assume the bus is too fast for this wiring
+            self.spi.max_speed_hz = SPI_FALLBACK_HZ
+            self.init()
 
     def _show_buf_full(self, buf: bytes):
-        white = bytes([0xFF]) * BUF_BYTES
-        self._cmd(DATA_START_TRANSMISSION_1); self._data(white)
+        self._cmd(DATA_START_TRANSMISSION_1); self._data(WHITE_FRAME)
         self._cmd(DATA_START_TRANSMISSION_2); self._data(buf)
         self._cmd(DISPLAY_REFRESH);           self._wait("REFRESH", 45.0)
 
     def show_image(self, img: Image.Image):
-        # full update with vertical flip for panel
-        img1b = img.convert("1").resize((W, H)).transpose(Image.FLIP_TOP_BOTTOM)
-        self._show_buf_full(_pil_to_panel_full(img1b))
+        # full update with vertical flip for panel; packed here because the
+        # renderer reuses img for the next frame
+        img1b = _to_panel_1b(img)
+        self._submit(self._show_buf_full, _pil_to_panel_full(img1b))
 
     # ------------------- FIXED (bbox flip to panel space) -------------------
     def show_partial(self, img: Image.Image, bbox):
@@ -154,8 +222,8 @@ class EPD583:
         if fy0 > fy1:
             fy0, fy1 = fy1, fy0
 
-        # 2) Prepare flipped, 1bpp image (panel space)
-        img1b = img.convert("1").resize((W, H)).transpose(Image.FLIP_TOP_BOTTOM)
+        # 2) 1bpp, UI orientation; _pack_region_bits flips just the box
+        img1b = _to_ui_1b(img)
 
         # 3) Align X to byte boundaries (controller wants full bytes)
         x0_al = max(0, x0 & ~7)
@@ -166,7 +234,9 @@ class EPD583:
             return
 
         payload = _pack_region_bits(img1b, x0_al, y0_al, x1_al, y1_al)
+        self._submit(self._push_partial, x0_al, y0_al, x1_al, y1_al, payload)
 
+    def _push_partial(self, x0_al, y0_al, x1_al, y1_al, payload: bytes):
         # 4) Partial window sequence
         self._cmd(PARTIAL_IN)
         self._cmd(PARTIAL_WINDOW)
@@ -182,20 +252,27 @@ class EPD583:
     # -----------------------------------------------------------------------
 
     def fill(self, white=False):
-        b = 0xFF if white else 0x00
-        self._show_buf_full(bytes([b]) * BUF_BYTES)
+        self._submit(self._show_buf_full, WHITE_FRAME if white else BLACK_FRAME)
 
     def deghost_cycle(self):
         self.fill(white=False); self.fill(white=True)
 
     def sleep(self):
+        self.flush()
         self._cmd(DEEP_SLEEP); self._data(0xA5)
 # ==========================================================================
 
 
+def _iso_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+@lru_cache(maxsize=1)
 def fonts_root() -> Path:
     return Path(__file__).resolve().parent / "fonts"
 
+# one Font per (file, size, style) for the whole session: every ExploreModal
+# shares them instead of re-parsing the TTFs on open
+@lru_cache(maxsize=64)
 def load_pygame_font(name: str, size: int, bold=False, italic=False) -> "pygame.font.Font":
     path = fonts_root() / name
     if path.exists():
@@ -241,6 +318,61 @@ def _ai_rewrite_text(raw_text: str, *, use_ai: bool = True, tone: str | None = N
         print(f"[AI fallback] {e}")
         return raw_text
 
+# the LLM rewrite takes seconds: it runs on one worker thread while the map
+# stays live, and the diamond shows the raw notes until the rewrite lands.
+# The worker is a daemon so quitting never blocks on a slow model; main()
+# gives in-flight rewrites AI_QUIT_WAIT_S to land, then drops the rest.
+AI_QUIT_WAIT_S = 5.0
+
+def _ai_worker(jobs):
+    while True:
+        fut, raw_text, tone = jobs.get()
+        if not fut.set_running_or_notify_cancel():
+            continue
+        try:
+            fut.set_result(_ai_rewrite_text(raw_text, tone=tone))
+        except Exception as e:
+            fut.set_exception(e)
+
+@lru_cache(maxsize=1)
+def _ai_jobs() -> queue.Queue:
+    jobs = queue.Queue()
+    threading.Thread(target=_ai_worker, args=(jobs,), name="ai-rewrite", daemon=True).start()
+    return jobs
+
+def _start_ai_rewrite(pending, hex_data, d, raw_text, *, use_ai: bool = True, tone: str | None = None) -> str:
+    """Queue a rewrite of d's notes; returns the text to store until it finishes."""
+    raw_text = (raw_text or "").strip()
+    if raw_text and use_ai:
+        fut = Future()
+        _ai_jobs().put((fut, raw_text, tone))
+        pending.append((hex_data, d, raw_text, fut))
+    return raw_text
+
+def _finish_ai_rewrites(pending, hex_data) -> bool:
+    """Store finished rewrites into hex_data (and save); True if anything changed."""
+    changed = False
+    for job in [j for j in pending if j[3].done()]:
+        pending.remove(job)
+        owner, d, raw_text, fut = job
+        # dropped if the hex was reset or the notes were edited again since
+        if owner is hex_data and d.get("text") == raw_text:
+            d["text"] = fut.result()
+            changed = True
+    if changed:
+        hex_data["updated_at"] = _iso_now()
+        save_hex(hex_data)
+    return changed
+
+def _drain_ai_rewrites(pending, hex_data, timeout_s: float = AI_QUIT_WAIT_S) -> None:
+    """On quit: save rewrites that land within timeout_s; the rest are dropped (raw notes stay saved)."""
+    if not pending:
+        return
+    wait_futures([j[3] for j in pending], timeout=timeout_s)
+    _finish_ai_rewrites(pending, hex_data)
+    if pending:
+        print(f"[AI] dropped {len(pending)} unfinished rewrite(s); raw notes are kept")
+
 # -------------------------- ExploreModal (restored) --------------------------
 class ExploreModal:
     def __init__(self, screen, ui, deck_value: int, initial=None):
@@ -267,49 +399,133 @@ class ExploreModal:
         self.pad = 10
         self.line_gap = 6
 
-        for ci, (_title, items) in enumerate(COLUMNS):
-            for ri, (key, _label) in enumerate(items):
-                if key == self.type_key:
-                    self.col_idx, self.row_idx = ci, ri
+        # (font, text, color) -> rendered Surface, LRU: static labels stay hot
+        # while each keystroke's new last note line pushes out stale ones
+        self._surf_cache = OrderedDict()
+        self._surf_cache_max = 512
+        # (text, font, max_w) -> wrapped lines; notes only change on a keystroke
+        self._wrap_cache = {}
+        self._wrap_cache_max = 16
+        # (paragraph, font, max_w) -> its lines; typing only re-wraps the
+        # paragraph being edited, the rest come from here
+        self._para_cache = {}
+        self._para_cache_max = 256
+        # text blits for the frame being drawn, issued in one screen.blits()
+        # after the shapes (text always sits on top of boxes/bars/markers)
+        self._text_blits = []
+        # title -> pre-drawn panel chrome (one per step)
+        self._chrome_cache = {}
+
+        if self.type_key in KEY_TO_CELL:
+            self.col_idx, self.row_idx = KEY_TO_CELL[self.type_key]
+
+        # step-2 picker: item positions never change
+        self._picker = self._picker_layout()
+        self._picker_surf = None
 
     def _wrap(self, text, font, max_w):
-        out, cur = [], ""
+        key = (text, font, max_w)
+        lines = self._wrap_cache.get(key)
+        if lines is None:
+            if len(self._wrap_cache) >= self._wrap_cache_max:
+                del self._wrap_cache[next(iter(self._wrap_cache))]   # oldest first
+            lines = self._wrap_cache[key] = self._wrap_uncached(text, font, max_w)
+        return lines
+
+    def _wrap_uncached(self, text, font, max_w):
+        # paragraphs wrap independently of each other
+        out = []
         for para in text.split("\n"):
-            cur = ""
-            for w in para.split(" "):
-                test = (cur + " " + w).strip()
-                if font.size(test)[0] <= max_w:
-                    cur = test
-                else:
-                    if cur: out.append(cur)
-                    cur = w
-            out.append(cur)
+            key = (para, font, max_w)
+            lines = self._para_cache.get(key)
+            if lines is None:
+                if len(self._para_cache) >= self._para_cache_max:
+                    self._para_cache.clear()
+                lines = self._para_cache[key] = self._wrap_paragraph(para, font, max_w)
+            out.extend(lines)
         return out or [""]
 
+    def _wrap_paragraph(self, para, font, max_w):
+        out, cur = [], ""
+        for w in para.split(" "):
+            test = (cur + " " + w).strip()
+            if font.size(test)[0] <= max_w:
+                cur = test
+            else:
+                if cur: out.append(cur)
+                cur = w
+        out.append(cur)
+        return tuple(out)
+
+    def _picker_layout(self):
+        """Per column: (title, x, title_y, [(label, y), ...]) in the step-2 panel."""
+        inner = self._panel_rect().inflate(-6, -6)
+        y = inner.y + 44 + self.pad          # below the title bar (see _draw_panel)
+        col_w = (inner.w - 2*self.pad) // 3
+        title_h = self.font_cat.get_height() + 6
+        item_h = self.font_item.get_height() + 6
+        layout = []
+        for ci, (title, items) in enumerate(COLUMNS):
+            cx = inner.x + self.pad + ci*col_w + 6
+            layout.append((title, cx, y, [(label, y + title_h + ri*item_h) for ri, (_, label) in enumerate(items)]))
+        return layout
+
+    def _picker_panel(self):
+        """Step-2 chrome with every column title and label pre-drawn; only the cursor moves."""
+        if self._picker_surf is None:
+            ox, oy = self._panel_rect().topleft
+            surf = self._panel_chrome("Choose a Feature Type").copy()
+            for title, cx, ty, items in self._picker:
+                surf.blit(self._text_surface(title, self.font_cat), (cx - ox, ty - oy))
+                for label, iy in items:
+                    surf.blit(self._text_surface(label, self.font_item), (cx + 12 - ox, iy - oy))
+            self._picker_surf = surf
+        return self._picker_surf
+
     def _panel_rect(self):
         Ww, Hh = self.screen.get_size()
         return pygame.Rect((Ww-500)//2, (Hh-300)//2, 500, 300)
 
+    def _panel_chrome(self, title):
+        """Border, white body, title bar and title for one step, as one Surface."""
+        chrome = self._chrome_cache.get(title)
+        if chrome is None:
+            w, h = self._panel_rect().size
+            chrome = pygame.Surface((w, h))
+            # black panel, white inner = 3px border
+            chrome.fill((0,0,0))
+            chrome.fill((255,255,255), pygame.Rect(3, 3, w - 6, h - 6))
+            chrome.fill((0,0,0), pygame.Rect(3, 3, w - 6, 44))
+            ty = 3 + (44 - self.font_title.get_height())//2
+            chrome.blit(self._text_surface(title, self.font_title, (255,255,255)), (3 + 12, ty))
+            self._chrome_cache[title] = chrome
+        return chrome
+
     def _draw_panel(self, title):
         rect = self._panel_rect()
         self.rect = rect
-        pygame.draw.rect(self.screen, (0,0,0), rect, 3)
+        self.screen.blit(self._panel_chrome(title), rect.topleft)
         inner = rect.inflate(-6, -6)
-        pygame.draw.rect(self.screen, (255,255,255), inner)
-        bar = pygame.Rect(inner.x, inner.y, inner.w, 44)
-        pygame.draw.rect(self.screen, (0,0,0), bar)
-        tx = bar.x + 12
-        ty = bar.y + (bar.h - self.font_title.get_height())//2
-        self.screen.blit(self.font_title.render(title, False, (255,255,255)), (tx, ty))
-        return inner.x + self.pad, bar.bottom + self.pad, inner
+        return inner.x + self.pad, inner.y + 44 + self.pad, inner
+
+    def _text_surface(self, txt, font, color=(0,0,0)):
+        key = (font, txt, color)
+        surf = self._surf_cache.get(key)
+        if surf is not None:
+            self._surf_cache.move_to_end(key)
+            return surf
+        surf = self._surf_cache[key] = font.render(txt, False, color)
+        if len(self._surf_cache) > self._surf_cache_max:
+            self._surf_cache.popitem(last=False)
+        return surf
 
     def _blit(self, txt, x, y, font, color=(0,0,0)):
-        surf = font.render(txt, False, color)
-        self.screen.blit(surf, (x, y)); return surf.get_width(), surf.get_height()
+        surf = self._text_surface(txt, font, color)
+        self._text_blits.append((surf, (x, y))); return surf.get_width(), surf.get_height()
 
     def _blit_in_box(self, text, box, font):
         pad = 8
-        wrapped = self._wrap(text, font, box.w - 2*pad)
+        wrapped = self._wrap(text, font, box.w - 2*pad)   # shared: don't mutate
         ty = box.y + pad
         line_h = font.get_height() + 3
         max_lines = max(1, (box.h - 2*pad) // line_h)
@@ -325,7 +541,7 @@ class ExploreModal:
 
         x0 = box.x + pad
         for ln in lines:
-            self.screen.blit(font.render(ln, False, (0,0,0)), (x0, ty))
+            self._text_blits.append((self._text_surface(ln, font), (x0, ty)))
             ty += line_h
 
     def _handle_text_input(self, current, event, limit):
@@ -336,11 +552,14 @@ class ExploreModal:
         return current
 
     def run(self):
-        clock = pygame.time.Clock()
+        # event-driven: sleep until input arrives, redraw only after a change
+        self._dirty = True
         while self.active:
-            for event in pygame.event.get():
+            for event in [pygame.event.wait(100)] + pygame.event.get():
                 if event.type == pygame.QUIT: self.active=False; return None
+                if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE): self._dirty = True
                 if event.type == pygame.KEYDOWN:
+                    self._dirty = True
                     if event.key == pygame.K_ESCAPE: self.active=False; return None
                     if self.step == 0 and event.key in (pygame.K_RETURN, pygame.K_KP_ENTER): self.step = 1
                     elif self.step == 1:
@@ -349,17 +568,20 @@ class ExploreModal:
                         elif event.key == pygame.K_BACKSPACE: self.name = self.name[:-1]
                         elif event.unicode and len(self.name) < 80: self.name += event.unicode
                     elif self.step == 2:
-                        cols = COLUMNS
+                        lens = COLUMN_LENS
                         if event.key in (pygame.K_LEFT, pygame.K_a):
-                            self.col_idx = (self.col_idx - 1) % len(cols); self.row_idx = min(self.row_idx, len(cols[self.col_idx][1]) - 1)
+                            self.col_idx = (self.col_idx - 1) % len(lens); self.row_idx = min(self.row_idx, lens[self.col_idx] - 1)
                         elif event.key in (pygame.K_RIGHT, pygame.K_d):
-                            self.col_idx = (self.col_idx + 1) % len(cols); self.row_idx = min(self.row_idx, len(cols[self.col_idx][1]) - 1)
-                        elif event.key in (pygame.K_UP, pygame.K_w): self.row_idx = (self.row_idx - 1) % len(cols[self.col_idx][1])
-                        elif event.key in (pygame.K_DOWN, pygame.K_s): self.row_idx = (self.row_idx + 1) % len(cols[self.col_idx][1])
+                            self.col_idx = (self.col_idx + 1) % len(lens); self.row_idx = min(self.row_idx, lens[self.col_idx] - 1)
+                        elif event.key in (pygame.K_UP, pygame.K_w): self.row_idx = (self.row_idx - 1) % lens[self.col_idx]
+                        elif event.key in (pygame.K_DOWN, pygame.K_s): self.row_idx = (self.row_idx + 1) % lens[self.col_idx]
                         elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
-                            self.type_key = cols[self.col_idx][1][self.row_idx][0]; self.step = 3
+                            self.type_key = COLUMNS[self.col_idx][1][self.row_idx][0]; self.step = 3
                     elif self.step == 3:
-                        if (event.key in (pygame.K_RETURN, pygame.K_KP_ENTER)) and (pygame.key.get_mods() & pygame.KMOD_CTRL): self.step = 4
+                        if (event.key in (pygame.K_RETURN, pygame.K_KP_ENTER)) and (pygame.key.get_mods() & pygame.KMOD_CTRL):
+                            # name/type are fixed from here on: format the summary once
+                            self._confirm_lines = (f"Name: {self.name}", f"Type: {KEY_TO_LABEL.get(self.type_key, '')}")
+                            self.step = 4
                         else: self.notes = self._handle_text_input(self.notes, event, 4000)
                     elif self.step == 4:
                         if event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
@@ -371,6 +593,9 @@ class ExploreModal:
                             }
                         elif event.key == pygame.K_BACKSPACE: self.step = 3
 
+            if not self._dirty:
+                continue
+            self._text_blits.clear()
             if self.step == 0:
                 x, y, inner = self._draw_panel(f"Explore — Draw from Deck")
                 self._blit("Draw a card for this diamond's deck.", x, y, self.font_item); y += self.font_item.get_height() + self.line_gap
@@ -382,56 +607,67 @@ class ExploreModal:
                 pygame.draw.line(self.screen, (0,0,0), (inner.x + self.pad, name_y), (inner.x + self.pad + underline_w, name_y), 2)
                 self._blit(self.name or "", inner.x + self.pad, y, self.font_item)
             elif self.step == 2:
-                x, y, inner = self._draw_panel("Choose a Feature Type")
-                cols_area_x = inner.x + self.pad
-                cols_area_w = inner.w - 2*self.pad
-                col_w = cols_area_w // 3
-                for ci, (title, items) in enumerate(COLUMNS):
-                    cx = cols_area_x + ci*col_w + 6
-                    self._blit(title, cx, y, self.font_cat)
-                    iy = y + self.font_cat.get_height() + 6
-                    for ri, (_key, label) in enumerate(items):
-                        if ci==self.col_idx and ri==self.row_idx:
-                            tri_size = 8
-                            tri_y = iy + self.font_item.get_height()//2
-                            tri_points = [(cx, tri_y), (cx, tri_y - tri_size), (cx + tri_size, tri_y - tri_size//2)]
-                            pygame.draw.polygon(self.screen, (0,0,0), tri_points)
-                            label_x = cx + tri_size + 4
-                        else:
-                            label_x = cx + 12
-                        self._blit(label, label_x, iy, self.font_item)
-                        iy += self.font_item.get_height() + 6
+                # labels sit at cx + 12 either way (the cursor fills cx..cx+8, +4 gap)
+                self.rect = self._panel_rect()
+                self.screen.blit(self._picker_panel(), self.rect.topleft)
+                tri_size = 8
+                _, cx, _, items = self._picker[self.col_idx]
+                tri_y = items[self.row_idx][1] + self.font_item.get_height()//2
+                tri_points = [(cx, tri_y), (cx, tri_y - tri_size), (cx + tri_size, tri_y - tri_size//2)]
+                pygame.draw.polygon(self.screen, (0,0,0), tri_points)
             elif self.step == 3:
                 x, y, inner = self._draw_panel("Notes / Features")
                 box = pygame.Rect(inner.x + self.pad, y, inner.w - 2*self.pad, inner.h - (y - inner.y) - 46)
-                pygame.draw.rect(self.screen, (255,255,255), box); pygame.draw.rect(self.screen, (0,0,0), box, 2)
+                self.screen.fill((255,255,255), box); pygame.draw.rect(self.screen, (0,0,0), box, 2)
                 self._blit_in_box(self.notes, box, self.font_text)
                 self._blit("Ctrl+Enter to continue", inner.x + self.pad, box.bottom + 6, self.font_hint)
             elif self.step == 4:
                 x, y, inner = self._draw_panel("Confirm")
-                self._blit(f"Name: {self.name}", x, y, self.font_item); y += self.font_item.get_height() + 4
-                from hexscribe.types import KEY_TO_LABEL as K2L
-                self._blit(f"Type: {K2L.get(self.type_key,'')}", x, y, self.font_item)
+                name_line, type_line = self._confirm_lines
+                self._blit(name_line, x, y, self.font_item); y += self.font_item.get_height() + 4
+                self._blit(type_line, x, y, self.font_item)
 
-            pygame.display.flip(); clock.tick(60)
+            self.screen.blits(self._text_blits, doreturn=False)
+            pygame.display.flip(); self._dirty = False
         return None
 # ------------------------------------------------------------------------------
 
+# 8-bit grayscale palette for preview surfaces
+GRAY_PALETTE = [(i, i, i) for i in range(256)]
+
+def frame_to_surface(img) -> "pygame.Surface":
+    """
+    Renderer frame (mode "1") -> palettized Surface. One byte per pixel and
+    frombuffer shares the bytes instead of copying them (vs RGB + fromstring).
+    """
+    surf = pygame.image.frombuffer(img.convert("L").tobytes(), img.size, "P")
+    surf.set_palette(GRAY_PALETTE)
+    return surf
+
 def compute_lr_tb_order(diamonds_xy):
-    idx_xy = [(i, x, y) for i, (x, y, _) in enumerate(diamonds_xy)]
-    idx_xy.sort(key=lambda t: (t[1], t[2]))  # x asc, then y asc
-    return [i for i, _x, _y in idx_xy]
+    # sort the indices directly (stable): x asc, then y asc
+    return sorted(range(len(diamonds_xy)), key=lambda i: (diamonds_xy[i][0], diamonds_xy[i][1]))
 
 # =============================  MAIN LOOP  =============================
 
 PARTIAL_THROTTLE_S = 0.40     # don't spam the controller
 PARTIAL_MAX_AREA   = 0.45     # partial only if <= 45% of screen changed
 
+# main loop: wakes on input (capped at MAX_FPS) or every IDLE_WAIT_MS
+MAX_FPS, IDLE_WAIT_MS = 60, 100
+
 def main():
     pygame.init()
     L = UILayout()
     screen = pygame.display.set_mode((L.width, L.height))
     pygame.display.set_caption(f"HexScrawl — Hex {HEX_ID}")
+    # only queue what the loops (and ExploreModal) handle; mouse motion etc.
+    # is dropped by SDL instead of becoming Python event objects. TEXTINPUT
+    # must stay allowed: pygame fills KEYDOWN.unicode from it, and the
+    # modal's name/notes typing reads that
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.TEXTINPUT,
+                              pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE])
     renderer = HexScreenRenderer(L)
 
     # E-Ink init + brief sanity so you know it’s alive
@@ -459,17 +695,29 @@ def main():
 
     USE_AI_PROSE = True
     AI_TONE = None
+    ai_pending = []   # (hex_data, diamond, raw notes, future)
 
     text_scroll = 0
     last_push_ts = 0.0
     last_epd_img = None
 
+    # the map only changes on a keypress (or a new order after a render);
+    # the window is only re-blitted after a new frame or an expose
+    dirty = redraw = True
+    img = pyg_img = None
+    ordered_for = None   # last_diamonds list the current order was built from
+    epd_stale = False    # a frame was rendered that the panel hasn't been diffed against
+
     running = True
     while running:
-        for event in pygame.event.get():
+        # sleep until input arrives instead of polling
+        for event in [pygame.event.wait(IDLE_WAIT_MS)] + pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                redraw = True
             elif event.type == pygame.KEYDOWN:
+                dirty = True
                 if event.key in (pygame.K_ESCAPE, pygame.K_q):
                     running = False
                 elif event.key in (pygame.K_LEFT,):
@@ -489,6 +737,7 @@ def main():
                 elif event.key in (pygame.K_r,):
                     delete_hex(HEX_ID); hex_data=None; hex_data_ref[0]=None; marks=None; order=[]; sel_ord=0; sel_actual=0; text_scroll=0
                 elif event.key in (pygame.K_w,):
+                    selected_index_ref[0] = sel_actual; hex_data_ref[0] = hex_data
                     img_for_epd = renderer.render(
                         hex_id=HEX_ID,
                         description=("Arrows/Numpad to move. Enter to explore. W=push full to e-ink. 9/3 scroll. G=deghost."),
@@ -515,7 +764,7 @@ def main():
                         modal = ExploreModal(screen, L, deck_value, initial=initial)
                         result = modal.run()
                         if result:
-                            rewritten_text = _ai_rewrite_text(result["text"], use_ai=USE_AI_PROSE, tone=AI_TONE)
+                            rewritten_text = _start_ai_rewrite(ai_pending, hex_data, d, result["text"], use_ai=USE_AI_PROSE, tone=AI_TONE)
                             d.update({
                                 "status": "discovered",
                                 "name": result["name"],
@@ -523,39 +772,47 @@ def main():
                                 "text": rewritten_text,
                                 "icon": result["icon"],
                             })
-                            hex_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+                            hex_data["updated_at"] = _iso_now()
                             save_hex(hex_data); hex_data_ref[0]=hex_data
                             text_scroll = 0
 
-        if getattr(renderer, "last_diamonds", None):
-            new_n = len(renderer.last_diamonds)
-            new_order = compute_lr_tb_order(renderer.last_diamonds) if new_n > 0 else []
+        if ai_pending and _finish_ai_rewrites(ai_pending, hex_data):
+            dirty = True
+
+        # last_diamonds is a fresh list per render: only re-sort after a render
+        diamonds = renderer.last_diamonds
+        if diamonds and diamonds is not ordered_for:
+            ordered_for = diamonds
+            new_order = compute_lr_tb_order(diamonds)
             if new_order != order:
+                dirty = True
                 order = new_order
                 sel_ord = 0
                 sel_actual = order[0] if order else 0
                 text_scroll = 0
 
-        selected_index_ref[0] = sel_actual
-        hex_data_ref[0] = hex_data
-
-        img = renderer.render(
-            hex_id=HEX_ID,
-            description=("Arrows/Numpad to move. Enter to explore. W=push full to e-ink. 9/3 scroll. G=deghost."),
-            features=[("keep","")],
-            marks=marks,
-            selected_idx=sel_actual,
-            feature_picker=picker,
-            text_scroll=text_scroll,
-        )
+        if dirty:
+            # the picker reads these during render(), and only then
+            selected_index_ref[0] = sel_actual
+            hex_data_ref[0] = hex_data
+            img = renderer.render(
+                hex_id=HEX_ID,
+                description=("Arrows/Numpad to move. Enter to explore. W=push full to e-ink. 9/3 scroll. G=deghost."),
+                features=[("keep","")],
+                marks=marks,
+                selected_idx=sel_actual,
+                feature_picker=picker,
+                text_scroll=text_scroll,
+            )
 
         if marks is None and renderer.last_marks:
             marks = renderer.last_marks[:]
+            now = _iso_now()
             hex_data = {
                 "hex_id": HEX_ID,
                 "seed": 0,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat(),
+                "created_at": now,
+                "updated_at": now,
                 "diamonds": [
                     {"uid": f"d{i:02d}","center_index": int(ci),"value": int(val),
                      "status": "unknown","name": None,"type": None,"text": None,"icon": None,"tags": []}
@@ -565,7 +822,7 @@ def main():
             }
             save_hex(hex_data); hex_data_ref[0] = hex_data
 
-        if getattr(renderer, "last_diamonds", None):
+        if renderer.last_diamonds:
             if order:
                 sel_ord = max(0, min(sel_ord, len(order)-1))
                 sel_actual = order[sel_ord]
@@ -575,18 +832,27 @@ def main():
             sel_ord = 0; sel_actual = 0
 
         # Preview window
-        rgb = img.convert("RGB")
-        pyg_img = pygame.image.fromstring(rgb.tobytes(), rgb.size, "RGB")
-        screen.blit(pyg_img, (0, 0))
-        pygame.display.flip()
+        if dirty:
+            pyg_img = frame_to_surface(img)
+            dirty = False
+            redraw = epd_stale = True
+        if redraw:
+            screen.blit(pyg_img, (0, 0))
+            pygame.display.flip()
+            redraw = False
 
         # --- Partial update to e-ink for small UI changes ---
         now = time.time()
         if last_epd_img is None:
             last_epd_img = img.copy()  # baseline; push later on 'W'
         else:
-            if (now - last_push_ts) >= PARTIAL_THROTTLE_S:
-                bbox = ImageChops.difference(img.convert("1"), last_epd_img.convert("1")).getbbox()
+            # while a refresh is still running, changes keep piling up in
+            # the diff against last_epd_img and go out as one box later
+            # (no new frame since the last diff means nothing new to push)
+            if epd_stale and (now - last_push_ts) >= PARTIAL_THROTTLE_S and epd.idle():
+                epd_stale = False
+                # renderer frames are already mode "1"; diff them directly
+                bbox = ImageChops.difference(img, last_epd_img).getbbox()
                 if bbox:
                     bw, bh = (bbox[2]-bbox[0]), (bbox[3]-bbox[1])
                     area = (bw * bh) / (W * H)
@@ -597,10 +863,12 @@ def main():
                         last_push_ts = now
                     # big changes wait for manual W
 
-        clock.tick(60)
+        clock.tick(MAX_FPS)
 
     epd.sleep()
-    pygame.quit(); sys.exit(0)
+    pygame.quit()
+    _drain_ai_rewrites(ai_pending, hex_data)
+    sys.exit(0)
 
 if __name__ == "__main__":
     main()
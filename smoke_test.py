@@ -10,7 +10,9 @@ from PIL import Image, ImageDraw, ImageFont
 PIN_DC, PIN_RST, PIN_BUSY = board.D22, board.D27, board.D17
 W, H = 648, 480
 BUF_BYTES = (W*H)//8
-SPI_MAX_CHUNK = 4096
+# same clock as epd_driver / run_interactive_epd, so a pass here vouches for
+# the wiring at the speed the app uses; drop to 4_000_000 to rule the bus out
+SPI_SPEED_HZ = 10_000_000
 
 # ONLY commands your working probe uses
 POWER_ON                       = 0x04
@@ -22,24 +24,13 @@ DEEP_SLEEP                     = 0x07
 
 def pil_to_panel(img):
     """Convert image to buffer"""
-    img = img.convert("1").resize((W, H))
-    pix = img.load()
-    out = bytearray(BUF_BYTES)
-    i = 0
-    for y in range(H):
-        b = 0
-        for x in range(W):
-            bit = 7 - (x & 7)
-            if pix[x, y] == 0:  # black
-                b |= (1 << bit)
-            if (x & 7) == 7:
-                out[i] = (~b) & 0xFF
-                i += 1
-                b = 0
-        if (W & 7) != 0:
-            out[i] = (~b) & 0xFF
-            i += 1
-    return bytes(out)
+    if img.mode != "1":
+        img = img.convert("1")
+    if img.size != (W, H):
+        img = img.resize((W, H))
+    # PIL's "1" raw layout is already MSB-first, 1=white, rows padded to a byte
+    # boundary, which is exactly what the panel wants.
+    return img.tobytes()
 
 class EPD:
     def __init__(self):
@@ -56,7 +47,7 @@ class EPD:
         
         self.spi = spidev.SpiDev()
         self.spi.open(0, 0)
-        self.spi.max_speed_hz = 4000000
+        self.spi.max_speed_hz = SPI_SPEED_HZ
         self.spi.mode = 0
     
     def _cmd(self, c):
@@ -68,12 +59,8 @@ class EPD:
         self.dc.value = 1
         if isinstance(b, int):
             b = [b]
-        if isinstance(b, (list, tuple)):
-            for i in range(0, len(b), SPI_MAX_CHUNK):
-                self.spi.xfer2(list(b[i:i+SPI_MAX_CHUNK]))
-        else:  # bytes
-            for i in range(0, len(b), SPI_MAX_CHUNK):
-                self.spi.xfer2(list(b[i:i+SPI_MAX_CHUNK]))
+        # writebytes2 takes any buffer and splits it at spidev's bufsiz itself
+        self.spi.writebytes2(bytes(b))
     
     def wait_idle(self, busy_high_is_busy, tag, timeout_s=45.0):
         t0 = time.time()